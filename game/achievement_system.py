@@ -1,325 +1,516 @@
-"""
-成就系统
-跟踪玩家的游戏成就和统计数据
-"""
-
-import json
-import os
-import time
-from typing import Dict, List, Any, Callable
-from datetime import datetime
-
-
-class Achievement:
-    """成就类"""
-    
-    def __init__(self, id: str, name: str, description: str, 
-                 condition: Callable, reward_points: int = 10,
-                 hidden: bool = False, category: str = "general"):
-        """初始化成就
-        
-        Args:
-            id: 成就ID
-            name: 成就名称
-            description: 成就描述
-            condition: 达成条件函数
-            reward_points: 奖励点数
-            hidden: 是否为隐藏成就
-            category: 成就分类
-        """
-        self.id = id
-        self.name = name
-        self.description = description
-        self.condition = condition
-        self.reward_points = reward_points
-        self.hidden = hidden
-        self.category = category
-        self.unlocked = False
-        self.unlock_time = None
-        self.progress = 0.0  # 进度百分比 (0.0 - 1.0)
-    
-    def check_condition(self, stats: Dict[str, Any]) -> bool:
-        """检查成就条件
-        
-        Args:
-            stats: 游戏统计数据
-            
-        Returns:
-            是否达成条件
-        """
-        try:
-            result = self.condition(stats)
-            if isinstance(result, tuple):
-                # 返回 (是否达成, 进度)
-                achieved, progress = result
-                self.progress = max(0.0, min(1.0, progress))
-                return achieved
-            else:
-                # 只返回是否达成
-                if result:
-                    self.progress = 1.0
-                return result
-        except Exception as e:
-            print(f"检查成就条件失败 {self.id}: {e}")
-            return False
-    
-    def unlock(self):
-        """解锁成就"""
-        if not self.unlocked:
-            self.unlocked = True
-            self.unlock_time = time.time()
-            self.progress = 1.0
-            print(f"🏆 成就解锁: {self.name}")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'reward_points': self.reward_points,
-            'hidden': self.hidden,
-            'category': self.category,
-            'unlocked': self.unlocked,
-            'unlock_time': self.unlock_time,
-            'progress': self.progress
-        }
-
-
-class AchievementSystem:
-    """成就系统"""
-    
-    def __init__(self, save_file: str = "achievements.json"):
-        """初始化成就系统
-        
-        Args:
-            save_file: 成就保存文件
-        """
-        self.save_file = save_file
-        self.achievements: Dict[str, Achievement] = {}
-        self.game_stats = self._load_stats()
-        
-        # 初始化成就
-        self._init_achievements()
-        
-        # 加载成就进度
-        self._load_achievements()
-    
-    def _init_achievements(self):
-        """初始化所有成就"""
-        # 分数相关成就
-        self._add_achievement("first_score", "初次得分", "获得第一分", 
-                            lambda s: s.get('total_score', 0) > 0, 5)
-        
-        self._add_achievement("score_100", "百分达人", "单局得分达到100分", 
-                            lambda s: s.get('highest_score', 0) >= 100, 10)
-        
-        self._add_achievement("score_500", "五百强者", "单局得分达到500分", 
-                            lambda s: s.get('highest_score', 0) >= 500, 25)
-        
-        self._add_achievement("score_1000", "千分传说", "单局得分达到1000分", 
-                            lambda s: s.get('highest_score', 0) >= 1000, 50)
-        
-        # 长度相关成就
-        self._add_achievement("length_10", "小蛇成长", "蛇长度达到10节", 
-                            lambda s: s.get('max_snake_length', 0) >= 10, 10)
-        
-        self._add_achievement("length_25", "中蛇进化", "蛇长度达到25节", 
-                            lambda s: s.get('max_snake_length', 0) >= 25, 20)
-        
-        self._add_achievement("length_50", "大蛇传奇", "蛇长度达到50节", 
-                            lambda s: s.get('max_snake_length', 0) >= 50, 40)
-        
-        # 时间相关成就
-        self._add_achievement("time_60", "一分钟挑战", "单局游戏时间达到60秒", 
-                            lambda s: s.get('max_game_time', 0) >= 60, 15)
-        
-        self._add_achievement("time_300", "五分钟马拉松", "单局游戏时间达到5分钟", 
-                            lambda s: s.get('max_game_time', 0) >= 300, 30)
-        
-        # 游戏次数相关成就
-        self._add_achievement("games_10", "新手玩家", "完成10局游戏", 
-                            lambda s: s.get('total_games', 0) >= 10, 10)
-        
-        self._add_achievement("games_50", "经验玩家", "完成50局游戏", 
-                            lambda s: s.get('total_games', 0) >= 50, 25)
-        
-        self._add_achievement("games_100", "资深玩家", "完成100局游戏", 
-                            lambda s: s.get('total_games', 0) >= 100, 50)
-        
-        # 特殊成就
-        self._add_achievement("special_food_10", "特殊美食家", "吃掉10个特殊食物", 
-                            lambda s: s.get('special_food_eaten', 0) >= 10, 20)
-        
-        self._add_achievement("perfect_start", "完美开局", "游戏开始后30秒内不死亡", 
-                            lambda s: s.get('perfect_starts', 0) >= 1, 15)
-        
-        self._add_achievement("speed_demon", "速度恶魔", "在最高速度下生存30秒", 
-                            lambda s: s.get('high_speed_survival', 0) >= 30, 35)
-        
-        # 隐藏成就
-        self._add_achievement("konami_code", "秘籍大师", "输入经典秘籍", 
-                            lambda s: s.get('konami_used', False), 100, True)
-        
-        self._add_achievement("no_death_hour", "不死传说", "连续游戏1小时不死亡", 
-                            lambda s: s.get('max_survival_time', 0) >= 3600, 200, True)
-    
-    def _add_achievement(self, id: str, name: str, description: str, 
-                        condition: Callable, points: int = 10, 
-                        hidden: bool = False, category: str = "general"):
-        """添加成就"""
-        achievement = Achievement(id, name, description, condition, points, hidden, category)
-        self.achievements[id] = achievement
-    
-    def update_stats(self, **kwargs):
-        """更新游戏统计数据"""
-        for key, value in kwargs.items():
-            if key in ['highest_score', 'max_snake_length', 'max_game_time', 'max_survival_time']:
-                # 这些是最大值统计
-                self.game_stats[key] = max(self.game_stats.get(key, 0), value)
-            elif key in ['total_score', 'total_games', 'special_food_eaten', 'perfect_starts']:
-                # 这些是累计统计
-                self.game_stats[key] = self.game_stats.get(key, 0) + value
-            else:
-                # 其他直接设置
-                self.game_stats[key] = value
-        
-        # 检查成就
-        self._check_achievements()
-    
-    def _check_achievements(self):
-        """检查所有成就"""
-        newly_unlocked = []
-        
-        for achievement in self.achievements.values():
-            if not achievement.unlocked:
-                if achievement.check_condition(self.game_stats):
-                    achievement.unlock()
-                    newly_unlocked.append(achievement)
-        
-        return newly_unlocked
-    
-    def get_achievement_progress(self, achievement_id: str) -> float:
-        """获取成就进度
-        
-        Args:
-            achievement_id: 成就ID
-            
-        Returns:
-            进度百分比 (0.0 - 1.0)
-        """
-        if achievement_id in self.achievements:
-            return self.achievements[achievement_id].progress
-        return 0.0
-    
-    def get_unlocked_achievements(self) -> List[Achievement]:
-        """获取已解锁的成就"""
-        return [a for a in self.achievements.values() if a.unlocked]
-    
-    def get_locked_achievements(self, include_hidden: bool = False) -> List[Achievement]:
-        """获取未解锁的成就"""
-        return [a for a in self.achievements.values() 
-                if not a.unlocked and (include_hidden or not a.hidden)]
-    
-    def get_achievements_by_category(self, category: str) -> List[Achievement]:
-        """按分类获取成就"""
-        return [a for a in self.achievements.values() if a.category == category]
-    
-    def get_total_points(self) -> int:
-        """获取总成就点数"""
-        return sum(a.reward_points for a in self.achievements.values() if a.unlocked)
-    
-    def get_completion_percentage(self) -> float:
-        """获取成就完成百分比"""
-        total = len(self.achievements)
-        unlocked = len(self.get_unlocked_achievements())
-        return (unlocked / total * 100) if total > 0 else 0.0
-    
-    def _load_stats(self) -> Dict[str, Any]:
-        """加载游戏统计数据"""
-        stats_file = "game_stats.json"
-        try:
-            if os.path.exists(stats_file):
-                with open(stats_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"加载统计数据失败: {e}")
-        
-        return {
-            'total_games': 0,
-            'total_score': 0,
-            'highest_score': 0,
-            'max_snake_length': 0,
-            'max_game_time': 0,
-            'special_food_eaten': 0,
-            'perfect_starts': 0,
-            'max_survival_time': 0
-        }
-    
-    def _save_stats(self):
-        """保存游戏统计数据"""
-        stats_file = "game_stats.json"
-        try:
-            with open(stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.game_stats, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"保存统计数据失败: {e}")
-    
-    def _load_achievements(self):
-        """加载成就进度"""
-        try:
-            if os.path.exists(self.save_file):
-                with open(self.save_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    for achievement_data in data.get('achievements', []):
-                        achievement_id = achievement_data.get('id')
-                        if achievement_id in self.achievements:
-                            achievement = self.achievements[achievement_id]
-                            achievement.unlocked = achievement_data.get('unlocked', False)
-                            achievement.unlock_time = achievement_data.get('unlock_time')
-                            achievement.progress = achievement_data.get('progress', 0.0)
-        except Exception as e:
-            print(f"加载成就数据失败: {e}")
-    
-    def save_achievements(self):
-        """保存成就进度"""
-        try:
-            data = {
-                'achievements': [a.to_dict() for a in self.achievements.values()],
-                'save_time': time.time()
-            }
-            
-            with open(self.save_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            # 同时保存统计数据
-            self._save_stats()
-            
-        except Exception as e:
-            print(f"保存成就数据失败: {e}")
-    
-    def reset_achievements(self):
-        """重置所有成就"""
-        for achievement in self.achievements.values():
-            achievement.unlocked = False
-            achievement.unlock_time = None
-            achievement.progress = 0.0
-        
-        self.game_stats = {
-            'total_games': 0,
-            'total_score': 0,
-            'highest_score': 0,
-            'max_snake_length': 0,
-            'max_game_time': 0,
-            'special_food_eaten': 0,
-            'perfect_starts': 0,
-            'max_survival_time': 0
-        }
-        
-        self.save_achievements()
-        print("所有成就已重置")
-
-
-# 创建全局成就系统实例
-achievement_system = AchievementSystem()
\ No newline at end of file
+"""
+成就系统
+跟踪玩家的游戏成就和统计数据
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Any, Callable, Optional
+from datetime import datetime
+
+# 成就系统日志器：替代热路径上的print，未配置处理器时几乎零开销
+logger = logging.getLogger("snake.achievements")
+
+# orjson是可选的加速依赖，缺失时退回stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def _dumps(obj) -> bytes:
+        """序列化为JSON字节串（orjson实现，带缩进）"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    def _loads(data: bytes):
+        """反序列化JSON字节串"""
+        return orjson.loads(data)
+else:
+    def _dumps(obj) -> bytes:
+        """序列化为JSON字节串（stdlib回退实现）"""
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+    def _loads(data: bytes):
+        """反序列化JSON字节串"""
+        return json.loads(data)
+
+
+class Achievement:
+    """成就类"""
+    
+    def __init__(self, id: str, name: str, description: str, 
+                 condition: Callable, reward_points: int = 10,
+                 hidden: bool = False, category: str = "general"):
+        """初始化成就
+        
+        Args:
+            id: 成就ID
+            name: 成就名称
+            description: 成就描述
+            condition: 达成条件函数
+            reward_points: 奖励点数
+            hidden: 是否为隐藏成就
+            category: 成就分类
+        """
+        self.id = id
+        self.name = name
+        self.description = description
+        self.condition = condition
+        self.reward_points = reward_points
+        self.hidden = hidden
+        self.category = category
+        self.unlocked = False
+        self.unlock_time = None
+        self.progress = 0.0  # 进度百分比 (0.0 - 1.0)
+    
+    def check_condition(self, stats: Dict[str, Any]) -> bool:
+        """检查成就条件
+        
+        Args:
+            stats: 游戏统计数据
+            
+        Returns:
+            是否达成条件
+        """
+        try:
+            result = self.condition(stats)
+            if isinstance(result, tuple):
+                # 返回 (是否达成, 进度)
+                achieved, progress = result
+                self.progress = max(0.0, min(1.0, progress))
+                return achieved
+            else:
+                # 只返回是否达成
+                if result:
+                    self.progress = 1.0
+                return result
+        except Exception as e:
+            logger.warning("检查成就条件失败 %s: %s", self.id, e)
+            return False
+    
+    def unlock(self):
+        """解锁成就"""
+        if not self.unlocked:
+            self.unlocked = True
+            self.unlock_time = time.time()
+            self.progress = 1.0
+            logger.info("🏆 成就解锁: %s", self.name)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'reward_points': self.reward_points,
+            'hidden': self.hidden,
+            'category': self.category,
+            'unlocked': self.unlocked,
+            'unlock_time': self.unlock_time,
+            'progress': self.progress
+        }
+
+
+class AchievementSystem:
+    """成就系统"""
+    
+    def __init__(self, save_file: str = "achievements.json"):
+        """初始化成就系统
+        
+        Args:
+            save_file: 成就保存文件
+        """
+        self.save_file = save_file
+        self.achievements: Dict[str, Achievement] = {}
+        self.game_stats = self._load_stats()
+        
+        # 初始化成就
+        self._init_achievements()
+
+        # 加载成就进度
+        self._load_achievements()
+
+        # 未解锁成就ID集合，解锁时增量移除，避免每次遍历全部成就
+        self._locked = {aid for aid, a in self.achievements.items() if not a.unlocked}
+
+        # 可序列化快照：加载后构建一次，之后只原地更新变化的条目，
+        # 避免每次保存都重建全部成就字典
+        self._snapshot = [a.to_dict() for a in self.achievements.values()]
+        self._snapshot_index = {entry['id']: entry for entry in self._snapshot}
+        self._dirty_ids: set = set()
+        self._stats_dirty = False
+    
+    def _init_achievements(self):
+        """初始化所有成就"""
+        # 分数相关成就
+        self._add_achievement("first_score", "初次得分", "获得第一分", 
+                            lambda s, _k='total_score': s.get(_k, 0) > 0, 5)
+        
+        self._add_achievement("score_100", "百分达人", "单局得分达到100分", 
+                            lambda s, _k='highest_score', _t=100: s.get(_k, 0) >= _t, 10)
+        
+        self._add_achievement("score_500", "五百强者", "单局得分达到500分", 
+                            lambda s, _k='highest_score', _t=500: s.get(_k, 0) >= _t, 25)
+        
+        self._add_achievement("score_1000", "千分传说", "单局得分达到1000分", 
+                            lambda s, _k='highest_score', _t=1000: s.get(_k, 0) >= _t, 50)
+        
+        # 长度相关成就
+        self._add_achievement("length_10", "小蛇成长", "蛇长度达到10节", 
+                            lambda s, _k='max_snake_length', _t=10: s.get(_k, 0) >= _t, 10)
+        
+        self._add_achievement("length_25", "中蛇进化", "蛇长度达到25节", 
+                            lambda s, _k='max_snake_length', _t=25: s.get(_k, 0) >= _t, 20)
+        
+        self._add_achievement("length_50", "大蛇传奇", "蛇长度达到50节", 
+                            lambda s, _k='max_snake_length', _t=50: s.get(_k, 0) >= _t, 40)
+        
+        # 时间相关成就
+        self._add_achievement("time_60", "一分钟挑战", "单局游戏时间达到60秒", 
+                            lambda s, _k='max_game_time', _t=60: s.get(_k, 0) >= _t, 15)
+        
+        self._add_achievement("time_300", "五分钟马拉松", "单局游戏时间达到5分钟", 
+                            lambda s, _k='max_game_time', _t=300: s.get(_k, 0) >= _t, 30)
+        
+        # 游戏次数相关成就
+        self._add_achievement("games_10", "新手玩家", "完成10局游戏", 
+                            lambda s, _k='total_games', _t=10: s.get(_k, 0) >= _t, 10)
+        
+        self._add_achievement("games_50", "经验玩家", "完成50局游戏", 
+                            lambda s, _k='total_games', _t=50: s.get(_k, 0) >= _t, 25)
+        
+        self._add_achievement("games_100", "资深玩家", "完成100局游戏", 
+                            lambda s, _k='total_games', _t=100: s.get(_k, 0) >= _t, 50)
+        
+        # 特殊成就
+        self._add_achievement("special_food_10", "特殊美食家", "吃掉10个特殊食物", 
+                            lambda s, _k='special_food_eaten', _t=10: s.get(_k, 0) >= _t, 20)
+        
+        self._add_achievement("perfect_start", "完美开局", "游戏开始后30秒内不死亡", 
+                            lambda s, _k='perfect_starts', _t=1: s.get(_k, 0) >= _t, 15)
+        
+        self._add_achievement("speed_demon", "速度恶魔", "在最高速度下生存30秒", 
+                            lambda s, _k='high_speed_survival', _t=30: s.get(_k, 0) >= _t, 35)
+        
+        # 隐藏成就
+        self._add_achievement("konami_code", "秘籍大师", "输入经典秘籍", 
+                            lambda s, _k='konami_used': s.get(_k, False), 100, True)
+        
+        self._add_achievement("no_death_hour", "不死传说", "连续游戏1小时不死亡",
+                            lambda s, _k='max_survival_time', _t=3600: s.get(_k, 0) >= _t, 200, True)
+
+        # 阈值型成就检查表: (成就ID, 统计键, 阈值)
+        # 直接用字典查询+比较代替lambda调用，降低每次检查的开销
+        self._threshold_checks = [
+            ("first_score", "total_score", 1),
+            ("score_100", "highest_score", 100),
+            ("score_500", "highest_score", 500),
+            ("score_1000", "highest_score", 1000),
+            ("length_10", "max_snake_length", 10),
+            ("length_25", "max_snake_length", 25),
+            ("length_50", "max_snake_length", 50),
+            ("time_60", "max_game_time", 60),
+            ("time_300", "max_game_time", 300),
+            ("games_10", "total_games", 10),
+            ("games_50", "total_games", 50),
+            ("games_100", "total_games", 100),
+            ("special_food_10", "special_food_eaten", 10),
+            ("perfect_start", "perfect_starts", 1),
+            ("speed_demon", "high_speed_survival", 30),
+            ("no_death_hour", "max_survival_time", 3600),
+        ]
+
+        # 布尔型成就检查表: (成就ID, 统计键)
+        self._bool_checks = [
+            ("konami_code", "konami_used"),
+        ]
+
+        # 其余成就仍走lambda条件路径
+        table_ids = ({aid for aid, _, _ in self._threshold_checks} |
+                     {aid for aid, _ in self._bool_checks})
+        self._custom_checks = frozenset(aid for aid in self.achievements
+                                        if aid not in table_ids)
+
+        # 每个统计键影响的成就ID，用于只检查受本次更新影响的成就
+        self._deps: Dict[str, List[str]] = {}
+        for aid, key, _ in self._threshold_checks:
+            self._deps.setdefault(key, []).append(aid)
+        for aid, key in self._bool_checks:
+            self._deps.setdefault(key, []).append(aid)
+
+    def _add_achievement(self, id: str, name: str, description: str, 
+                        condition: Callable, points: int = 10, 
+                        hidden: bool = False, category: str = "general"):
+        """添加成就"""
+        achievement = Achievement(id, name, description, condition, points, hidden, category)
+        self.achievements[id] = achievement
+    
+    def update_stats(self, **kwargs):
+        """更新游戏统计数据"""
+        stats = self.game_stats
+        changed = set()
+
+        for key, value in kwargs.items():
+            if key in ('highest_score', 'max_snake_length', 'max_game_time', 'max_survival_time'):
+                # 这些是最大值统计，只有实际提高了才算变化
+                if value > stats.get(key, 0):
+                    stats[key] = value
+                    changed.add(key)
+            elif key in ('total_score', 'total_games', 'special_food_eaten', 'perfect_starts'):
+                # 这些是累计统计，增量为0时不算变化
+                if value:
+                    stats[key] = stats.get(key, 0) + value
+                    changed.add(key)
+            else:
+                # 其他直接设置
+                if stats.get(key) != value:
+                    stats[key] = value
+                    changed.add(key)
+
+        # 只在有统计实际变化时检查受影响的成就
+        if changed:
+            self._stats_dirty = True
+            self._check_achievements(changed)
+    
+    def _check_achievements(self, changed_keys=None):
+        """检查未解锁的成就
+
+        Args:
+            changed_keys: 本次更新中实际变化的统计键集合，None表示全量检查
+        """
+        newly_unlocked = []
+        stats = self.game_stats
+        locked = self._locked
+
+        # 全部解锁后整套检查直接短路
+        if not locked:
+            return newly_unlocked
+
+        if changed_keys is None:
+            threshold_checks = self._threshold_checks
+            bool_checks = self._bool_checks
+        else:
+            # 只保留依赖了变化统计键且仍未解锁的成就
+            candidates = set()
+            for key in changed_keys:
+                candidates.update(self._deps.get(key, ()))
+            candidates &= locked
+            if not candidates and not (self._custom_checks & locked):
+                return newly_unlocked
+            threshold_checks = [entry for entry in self._threshold_checks
+                                if entry[0] in candidates]
+            bool_checks = [entry for entry in self._bool_checks
+                           if entry[0] in candidates]
+
+        dirty_ids = self._dirty_ids
+
+        # 阈值型成就：一次字典查询加一次比较
+        for aid, key, threshold in threshold_checks:
+            if aid not in locked:
+                continue
+            value = stats.get(key, 0)
+            achievement = self.achievements[aid]
+            if value >= threshold:
+                achievement.unlock()
+                locked.discard(aid)
+                newly_unlocked.append(achievement)
+                dirty_ids.add(aid)
+            else:
+                progress = min(1.0, value / threshold)
+                if progress != achievement.progress:
+                    achievement.progress = progress
+                    dirty_ids.add(aid)
+
+        # 布尔型成就
+        for aid, key in bool_checks:
+            if aid not in locked:
+                continue
+            if stats.get(key, False):
+                achievement = self.achievements[aid]
+                achievement.unlock()
+                locked.discard(aid)
+                newly_unlocked.append(achievement)
+                dirty_ids.add(aid)
+
+        # 自定义条件成就仍走lambda路径，只遍历仍未解锁的部分
+        for aid in self._custom_checks & locked:
+            achievement = self.achievements[aid]
+            old_progress = achievement.progress
+            if achievement.check_condition(stats):
+                achievement.unlock()
+                locked.discard(aid)
+                newly_unlocked.append(achievement)
+                dirty_ids.add(aid)
+            elif achievement.progress != old_progress:
+                dirty_ids.add(aid)
+
+        return newly_unlocked
+    
+    def get_achievement_progress(self, achievement_id: str) -> float:
+        """获取成就进度
+        
+        Args:
+            achievement_id: 成就ID
+            
+        Returns:
+            进度百分比 (0.0 - 1.0)
+        """
+        if achievement_id in self.achievements:
+            return self.achievements[achievement_id].progress
+        return 0.0
+    
+    def get_unlocked_achievements(self) -> List[Achievement]:
+        """获取已解锁的成就"""
+        return [a for a in self.achievements.values() if a.unlocked]
+    
+    def get_locked_achievements(self, include_hidden: bool = False) -> List[Achievement]:
+        """获取未解锁的成就"""
+        return [a for a in self.achievements.values() 
+                if not a.unlocked and (include_hidden or not a.hidden)]
+    
+    def get_achievements_by_category(self, category: str) -> List[Achievement]:
+        """按分类获取成就"""
+        return [a for a in self.achievements.values() if a.category == category]
+    
+    def get_total_points(self) -> int:
+        """获取总成就点数"""
+        return sum(a.reward_points for a in self.achievements.values() if a.unlocked)
+    
+    def get_completion_percentage(self) -> float:
+        """获取成就完成百分比"""
+        total = len(self.achievements)
+        unlocked = len(self.get_unlocked_achievements())
+        return (unlocked / total * 100) if total > 0 else 0.0
+    
+    def _load_stats(self) -> Dict[str, Any]:
+        """加载游戏统计数据"""
+        stats_file = "game_stats.json"
+        try:
+            if os.path.exists(stats_file):
+                with open(stats_file, 'rb') as f:
+                    return _loads(f.read())
+        except Exception as e:
+            logger.warning("加载统计数据失败: %s", e)
+        
+        return {
+            'total_games': 0,
+            'total_score': 0,
+            'highest_score': 0,
+            'max_snake_length': 0,
+            'max_game_time': 0,
+            'special_food_eaten': 0,
+            'perfect_starts': 0,
+            'max_survival_time': 0
+        }
+    
+    def _save_stats(self):
+        """保存游戏统计数据"""
+        stats_file = "game_stats.json"
+        try:
+            with open(stats_file, 'wb') as f:
+                f.write(_dumps(self.game_stats))
+        except Exception as e:
+            logger.warning("保存统计数据失败: %s", e)
+    
+    def _load_achievements(self):
+        """加载成就进度"""
+        try:
+            if os.path.exists(self.save_file):
+                with open(self.save_file, 'rb') as f:
+                    data = _loads(f.read())
+                    
+                    for achievement_data in data.get('achievements', []):
+                        achievement_id = achievement_data.get('id')
+                        if achievement_id in self.achievements:
+                            achievement = self.achievements[achievement_id]
+                            achievement.unlocked = achievement_data.get('unlocked', False)
+                            achievement.unlock_time = achievement_data.get('unlock_time')
+                            achievement.progress = achievement_data.get('progress', 0.0)
+        except Exception as e:
+            logger.warning("加载成就数据失败: %s", e)
+    
+    def save_achievements(self):
+        """保存成就进度（只有数据变化时才写盘）"""
+        if not self._dirty_ids and not self._stats_dirty:
+            return
+
+        try:
+            if self._dirty_ids:
+                # 只把有变化的成就同步进快照
+                for aid in self._dirty_ids:
+                    achievement = self.achievements[aid]
+                    entry = self._snapshot_index[aid]
+                    entry['unlocked'] = achievement.unlocked
+                    entry['unlock_time'] = achievement.unlock_time
+                    entry['progress'] = achievement.progress
+
+                data = {
+                    'achievements': self._snapshot,
+                    'save_time': time.time()
+                }
+
+                # 先写临时文件再原子替换，避免写到一半损坏存档
+                tmp_file = f"{self.save_file}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(_dumps(data))
+                os.replace(tmp_file, self.save_file)
+                self._dirty_ids.clear()
+
+            # 同时保存统计数据
+            if self._stats_dirty:
+                self._save_stats()
+                self._stats_dirty = False
+
+        except Exception as e:
+            logger.warning("保存成就数据失败: %s", e)
+    
+    def reset_achievements(self):
+        """重置所有成就"""
+        for achievement in self.achievements.values():
+            achievement.unlocked = False
+            achievement.unlock_time = None
+            achievement.progress = 0.0
+
+        self._locked = set(self.achievements)
+        self._dirty_ids = set(self.achievements)
+        self._stats_dirty = True
+
+        self.game_stats = {
+            'total_games': 0,
+            'total_score': 0,
+            'highest_score': 0,
+            'max_snake_length': 0,
+            'max_game_time': 0,
+            'special_food_eaten': 0,
+            'perfect_starts': 0,
+            'max_survival_time': 0
+        }
+        
+        self.save_achievements()
+        logger.info("所有成就已重置")
+
+
+# 全局成就系统实例（惰性构造，首次获取时才读取存档文件）
+_achievement_system: Optional[AchievementSystem] = None
+
+
+def get_achievement_system() -> AchievementSystem:
+    """获取全局成就系统实例，首次调用时构造
+
+    Returns:
+        全局AchievementSystem实例
+    """
+    global _achievement_system
+    if _achievement_system is None:
+        _achievement_system = AchievementSystem()
+    return _achievement_system
+
+
+def __getattr__(name):
+    """兼容旧的 `from .achievement_system import achievement_system` 写法"""
+    if name == 'achievement_system':
+        return get_achievement_system()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
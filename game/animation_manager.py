@@ -1,389 +1,616 @@
-"""
-动画管理器
-提供各种动画效果
-"""
-
-import random
-import pygame
-import math
-import time
-from typing import List, Dict, Any, Callable, Optional, Tuple
-from .constants import *
-
-
-class Animation:
-    """动画基类"""
-    
-    def __init__(self, duration: float, easing_func: Callable = None):
-        """初始化动画
-        
-        Args:
-            duration: 动画持续时间（秒）
-            easing_func: 缓动函数
-        """
-        self.duration = duration
-        self.start_time = time.time()
-        self.is_finished = False
-        self.easing_func = easing_func or self._linear
-    
-    def _linear(self, t: float) -> float:
-        """线性缓动"""
-        return t
-    
-    def _ease_in_out(self, t: float) -> float:
-        """缓入缓出"""
-        return 3 * t * t - 2 * t * t * t
-    
-    def _ease_out_bounce(self, t: float) -> float:
-        """弹跳缓出"""
-        if t < 1/2.75:
-            return 7.5625 * t * t
-        elif t < 2/2.75:
-            t -= 1.5/2.75
-            return 7.5625 * t * t + 0.75
-        elif t < 2.5/2.75:
-            t -= 2.25/2.75
-            return 7.5625 * t * t + 0.9375
-        else:
-            t -= 2.625/2.75
-            return 7.5625 * t * t + 0.984375
-    
-    def get_progress(self) -> float:
-        """获取动画进度 (0.0 - 1.0)"""
-        elapsed = time.time() - self.start_time
-        progress = min(1.0, elapsed / self.duration)
-        
-        if progress >= 1.0:
-            self.is_finished = True
-        
-        return self.easing_func(progress)
-    
-    def update(self) -> bool:
-        """更新动画
-        
-        Returns:
-            动画是否继续
-        """
-        return not self.is_finished
-    
-    def draw(self, screen: pygame.Surface):
-        """绘制动画"""
-        pass
-
-
-class FadeAnimation(Animation):
-    """淡入淡出动画"""
-    
-    def __init__(self, surface: pygame.Surface, start_alpha: int, 
-                 end_alpha: int, duration: float, fade_in: bool = True):
-        """初始化淡入淡出动画
-        
-        Args:
-            surface: 要应用动画的表面
-            start_alpha: 起始透明度 (0-255)
-            end_alpha: 结束透明度 (0-255)
-            duration: 动画持续时间
-            fade_in: 是否为淡入动画
-        """
-        super().__init__(duration, self._ease_in_out)
-        self.surface = surface
-        self.start_alpha = start_alpha
-        self.end_alpha = end_alpha
-        self.fade_in = fade_in
-        
-        # 确保表面支持alpha
-        self.surface = self.surface.convert_alpha()
-    
-    def update(self) -> bool:
-        if self.is_finished:
-            return False
-        
-        progress = self.get_progress()
-        current_alpha = int(self.start_alpha + (self.end_alpha - self.start_alpha) * progress)
-        self.surface.set_alpha(current_alpha)
-        
-        return not self.is_finished
-    
-    def draw(self, screen: pygame.Surface):
-        """绘制淡入淡出效果"""
-        # 淡入淡出效果已经应用到surface的alpha上
-        pass
-
-
-class ScaleAnimation(Animation):
-    """缩放动画"""
-    
-    def __init__(self, start_scale: float, end_scale: float, duration: float,
-                 center: Tuple[int, int] = None):
-        """初始化缩放动画
-        
-        Args:
-            start_scale: 起始缩放比例
-            end_scale: 结束缩放比例
-            duration: 动画持续时间
-            center: 缩放中心点
-        """
-        super().__init__(duration, self._ease_out_bounce)
-        self.start_scale = start_scale
-        self.end_scale = end_scale
-        self.center = center or (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
-        self.current_scale = start_scale
-    
-    def update(self) -> bool:
-        if self.is_finished:
-            return False
-        
-        progress = self.get_progress()
-        self.current_scale = self.start_scale + (self.end_scale - self.start_scale) * progress
-        
-        return not self.is_finished
-    
-    def get_current_scale(self) -> float:
-        """获取当前缩放比例"""
-        return self.current_scale
-
-
-class SlideAnimation(Animation):
-    """滑动动画"""
-    
-    def __init__(self, start_pos: Tuple[int, int], end_pos: Tuple[int, int], 
-                 duration: float):
-        """初始化滑动动画
-        
-        Args:
-            start_pos: 起始位置
-            end_pos: 结束位置
-            duration: 动画持续时间
-        """
-        super().__init__(duration, self._ease_in_out)
-        self.start_pos = start_pos
-        self.end_pos = end_pos
-        self.current_pos = start_pos
-    
-    def update(self) -> bool:
-        if self.is_finished:
-            return False
-        
-        progress = self.get_progress()
-        x = int(self.start_pos[0] + (self.end_pos[0] - self.start_pos[0]) * progress)
-        y = int(self.start_pos[1] + (self.end_pos[1] - self.start_pos[1]) * progress)
-        self.current_pos = (x, y)
-        
-        return not self.is_finished
-    
-    def get_current_pos(self) -> Tuple[int, int]:
-        """获取当前位置"""
-        return self.current_pos
-
-
-class PulseAnimation(Animation):
-    """脉冲动画"""
-    
-    def __init__(self, base_scale: float, pulse_scale: float, duration: float):
-        """初始化脉冲动画
-        
-        Args:
-            base_scale: 基础缩放
-            pulse_scale: 脉冲缩放
-            duration: 动画持续时间
-        """
-        super().__init__(duration)
-        self.base_scale = base_scale
-        self.pulse_scale = pulse_scale
-        self.current_scale = base_scale
-    
-    def update(self) -> bool:
-        progress = self.get_progress()
-        # 使用正弦波创建脉冲效果
-        pulse_factor = math.sin(progress * math.pi * 4) * 0.5 + 0.5
-        self.current_scale = self.base_scale + (self.pulse_scale - self.base_scale) * pulse_factor
-        
-        # 脉冲动画可以循环
-        if self.is_finished:
-            self.start_time = time.time()
-            self.is_finished = False
-        
-        return True
-    
-    def get_current_scale(self) -> float:
-        """获取当前缩放比例"""
-        return self.current_scale
-
-
-class ParticleEffect:
-    """粒子效果"""
-    
-    def __init__(self, pos: Tuple[int, int], color: Tuple[int, int, int],
-                 count: int = 10, lifetime: float = 1.0):
-        """初始化粒子效果
-        
-        Args:
-            pos: 发射位置
-            color: 粒子颜色
-            count: 粒子数量
-            lifetime: 粒子生命周期
-        """
-        self.particles = []
-        self.lifetime = lifetime
-        
-        for _ in range(count):
-            particle = {
-                'x': pos[0],
-                'y': pos[1],
-                'vx': (random.random() - 0.5) * 200,  # 随机速度
-                'vy': (random.random() - 0.5) * 200,
-                'life': lifetime,
-                'max_life': lifetime,
-                'color': color,
-                'size': random.randint(2, 6)
-            }
-            self.particles.append(particle)
-    
-    def update(self, dt: float) -> bool:
-        """更新粒子
-        
-        Args:
-            dt: 时间增量
-            
-        Returns:
-            是否还有活跃粒子
-        """
-        active_particles = []
-        
-        for particle in self.particles:
-            particle['life'] -= dt
-            if particle['life'] > 0:
-                # 更新位置
-                particle['x'] += particle['vx'] * dt
-                particle['y'] += particle['vy'] * dt
-                
-                # 应用重力
-                particle['vy'] += 300 * dt
-                
-                active_particles.append(particle)
-        
-        self.particles = active_particles
-        return len(self.particles) > 0
-    
-    def draw(self, screen: pygame.Surface):
-        """绘制粒子"""
-        for particle in self.particles:
-            # 根据生命周期计算透明度
-            alpha = int(255 * (particle['life'] / particle['max_life']))
-            color = (*particle['color'], alpha)
-            
-            # 创建带透明度的表面
-            particle_surface = pygame.Surface((particle['size'] * 2, particle['size'] * 2), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surface, color, 
-                             (particle['size'], particle['size']), particle['size'])
-            
-            screen.blit(particle_surface, (int(particle['x'] - particle['size']), 
-                                         int(particle['y'] - particle['size'])))
-
-
-class AnimationManager:
-    """动画管理器"""
-    
-    def __init__(self):
-        """初始化动画管理器"""
-        # 确保pygame已初始化
-        if not pygame.get_init():
-            pygame.init()
-            
-        self.animations: List[Animation] = []
-        self.particle_effects: List[ParticleEffect] = []
-        self.last_update_time = time.time()
-    
-    def add_animation(self, animation: Animation):
-        """添加动画"""
-        self.animations.append(animation)
-    
-    def add_particle_effect(self, effect: ParticleEffect):
-        """添加粒子效果"""
-        self.particle_effects.append(effect)
-    
-    def create_fade_in(self, surface: pygame.Surface, duration: float = 0.5) -> FadeAnimation:
-        """创建淡入动画"""
-        animation = FadeAnimation(surface, 0, 255, duration, True)
-        self.add_animation(animation)
-        return animation
-    
-    def create_fade_out(self, surface: pygame.Surface, duration: float = 0.5) -> FadeAnimation:
-        """创建淡出动画"""
-        animation = FadeAnimation(surface, 255, 0, duration, False)
-        self.add_animation(animation)
-        return animation
-    
-    def create_scale_animation(self, start_scale: float, end_scale: float, 
-                              duration: float = 0.3) -> ScaleAnimation:
-        """创建缩放动画"""
-        animation = ScaleAnimation(start_scale, end_scale, duration)
-        self.add_animation(animation)
-        return animation
-    
-    def create_slide_animation(self, start_pos: Tuple[int, int], end_pos: Tuple[int, int],
-                              duration: float = 0.5) -> SlideAnimation:
-        """创建滑动动画"""
-        animation = SlideAnimation(start_pos, end_pos, duration)
-        self.add_animation(animation)
-        return animation
-    
-    def create_pulse_animation(self, base_scale: float = 1.0, pulse_scale: float = 1.2,
-                              duration: float = 1.0) -> PulseAnimation:
-        """创建脉冲动画"""
-        animation = PulseAnimation(base_scale, pulse_scale, duration)
-        self.add_animation(animation)
-        return animation
-    
-    def create_explosion_effect(self, pos: Tuple[int, int], color: Tuple[int, int, int] = RED):
-        """创建爆炸效果"""
-        effect = ParticleEffect(pos, color, count=15, lifetime=1.5)
-        self.add_particle_effect(effect)
-    
-    def create_score_effect(self, pos: Tuple[int, int], color: Tuple[int, int, int] = GOLD):
-        """创建得分效果"""
-        effect = ParticleEffect(pos, color, count=8, lifetime=1.0)
-        self.add_particle_effect(effect)
-    
-    def update(self):
-        """更新所有动画"""
-        current_time = time.time()
-        dt = current_time - self.last_update_time
-        self.last_update_time = current_time
-        
-        # 更新动画
-        active_animations = []
-        for animation in self.animations:
-            if animation.update():
-                active_animations.append(animation)
-        self.animations = active_animations
-        
-        # 更新粒子效果
-        active_effects = []
-        for effect in self.particle_effects:
-            if effect.update(dt):
-                active_effects.append(effect)
-        self.particle_effects = active_effects
-    
-    def draw(self, screen: pygame.Surface):
-        """绘制所有动画效果"""
-        # 绘制动画
-        for animation in self.animations:
-            animation.draw(screen)
-        
-        # 绘制粒子效果
-        for effect in self.particle_effects:
-            effect.draw(screen)
-    
-    def clear_all(self):
-        """清除所有动画"""
-        self.animations.clear()
-        self.particle_effects.clear()
-    
-    def get_animation_count(self) -> int:
-        """获取活跃动画数量"""
-        return len(self.animations) + len(self.particle_effects)
-
-
-# 创建全局动画管理器实例
-animation_manager = AnimationManager()
\ No newline at end of file
+"""
+动画管理器
+提供各种动画效果
+"""
+
+import random
+import pygame
+import math
+import numpy as np
+from array import array
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from .constants import *
+
+# numba是可选的加速依赖，缺失时退回纯NumPy向量化路径
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _integrate_particles(x, y, vx, vy, life, dt):
+        """粒子积分内核：位置、重力和生命倒数在一趟循环内原地完成"""
+        for i in range(x.shape[0]):
+            x[i] += vx[i] * dt
+            y[i] += vy[i] * dt
+            vy[i] += 300.0 * dt
+            life[i] -= dt
+else:
+    def _integrate_particles(x, y, vx, vy, life, dt):
+        """粒子积分（NumPy原地向量化回退实现）"""
+        x += vx * dt
+        y += vy * dt
+        vy += 300.0 * dt
+        life -= dt
+
+
+def _bounce(t: float) -> float:
+    """弹跳缓出曲线（仅用于构建查找表）"""
+    if t < 1/2.75:
+        return 7.5625 * t * t
+    elif t < 2/2.75:
+        t -= 1.5/2.75
+        return 7.5625 * t * t + 0.75
+    elif t < 2.5/2.75:
+        t -= 2.25/2.75
+        return 7.5625 * t * t + 0.9375
+    else:
+        t -= 2.625/2.75
+        return 7.5625 * t * t + 0.984375
+
+
+# 缓动查找表：用一次索引代替每帧的分支多项式/三角函数调用
+_EASE_STEPS = 1023
+_BOUNCE_TABLE = array('f', (_bounce(i / _EASE_STEPS) for i in range(_EASE_STEPS + 1)))
+_PULSE_TABLE = array('f', (math.sin(i / _EASE_STEPS * math.pi * 4) * 0.5 + 0.5
+                           for i in range(_EASE_STEPS + 1)))
+
+# 补间引擎的缓动类型编号，对应_EASE_TABLE的行
+EASE_LINEAR = 0
+EASE_IN_OUT = 1
+EASE_OUT_BOUNCE = 2
+EASE_PULSE = 3
+
+# 所有缓动曲线汇总成一张 (类型, 步进) 二维表，step中用花式索引一次取值
+_EASE_TABLE = np.empty((4, _EASE_STEPS + 1), dtype=np.float32)
+_EASE_TABLE[EASE_LINEAR] = np.linspace(0.0, 1.0, _EASE_STEPS + 1)
+_EASE_TABLE[EASE_IN_OUT] = (3 * _EASE_TABLE[EASE_LINEAR] ** 2 -
+                            2 * _EASE_TABLE[EASE_LINEAR] ** 3)
+_EASE_TABLE[EASE_OUT_BOUNCE] = np.frombuffer(_BOUNCE_TABLE, dtype=np.float32)
+_EASE_TABLE[EASE_PULSE] = np.frombuffer(_PULSE_TABLE, dtype=np.float32)
+
+
+class TweenEngine:
+    """批量补间引擎
+
+    所有活跃补间的参数以SoA数组存放，每帧一次向量化步进即可推进
+    全部补间，动画类只需按句柄读取当前值。
+    """
+
+    def __init__(self, capacity: int = 64):
+        """初始化补间引擎
+
+        Args:
+            capacity: 初始容量，不足时自动翻倍
+        """
+        self._capacity = capacity
+        # 每个补间最多两个分量（标量补间只用第0个分量）
+        self._starts = np.zeros((capacity, 2), dtype=np.float32)
+        self._ends = np.zeros((capacity, 2), dtype=np.float32)
+        self._start_times = np.zeros(capacity, dtype=np.float32)
+        self._durations = np.ones(capacity, dtype=np.float32)
+        self._kinds = np.zeros(capacity, dtype=np.int32)
+        self._loops = np.zeros(capacity, dtype=bool)
+        self._active = np.zeros(capacity, dtype=bool)
+        self.values = np.zeros((capacity, 2), dtype=np.float32)
+        self.finished = np.zeros(capacity, dtype=bool)
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def add(self, start: Tuple[float, float], end: Tuple[float, float],
+            duration: float, kind: int, loop: bool = False) -> int:
+        """注册一个补间，返回用于读值的句柄"""
+        if not self._free:
+            self._grow()
+        handle = self._free.pop()
+        self._starts[handle] = start
+        self._ends[handle] = end
+        self._start_times[handle] = Animation._now
+        self._durations[handle] = max(duration, 1e-6)
+        self._kinds[handle] = kind
+        self._loops[handle] = loop
+        self._active[handle] = True
+        self.values[handle] = start
+        self.finished[handle] = False
+        return handle
+
+    def release(self, handle: int):
+        """释放句柄对应的补间槽位（可安全重复调用）"""
+        if self._active[handle]:
+            self._active[handle] = False
+            self._free.append(handle)
+
+    def step(self, now: float):
+        """推进所有活跃补间到时刻now"""
+        active = self._active
+        if not active.any():
+            return
+
+        t = (now - self._start_times) / self._durations
+        np.clip(t, 0.0, 1.0, out=t)
+
+        # 循环补间（脉冲）到达终点后重置起始时间继续
+        done = (t >= 1.0) & active
+        loop_reset = done & self._loops
+        if loop_reset.any():
+            self._start_times[loop_reset] = now
+            t[loop_reset] = 0.0
+            done &= ~self._loops
+
+        eased = _EASE_TABLE[self._kinds, (t * _EASE_STEPS).astype(np.int32)]
+        self.values[...] = self._starts + (self._ends - self._starts) * eased[:, None]
+        self.finished |= done
+
+    def _grow(self):
+        """容量翻倍并把新槽位加入空闲列表"""
+        old = self._capacity
+        new = old * 2
+
+        def extend(arr, fill=0):
+            shape = (new,) + arr.shape[1:]
+            grown = np.full(shape, fill, dtype=arr.dtype)
+            grown[:old] = arr
+            return grown
+
+        self._starts = extend(self._starts)
+        self._ends = extend(self._ends)
+        self._start_times = extend(self._start_times)
+        self._durations = extend(self._durations, 1)
+        self._kinds = extend(self._kinds)
+        self._loops = extend(self._loops)
+        self._active = extend(self._active)
+        self.values = extend(self.values)
+        self.finished = extend(self.finished)
+        self._free.extend(range(new - 1, old - 1, -1))
+        self._capacity = new
+
+
+# 创建全局补间引擎实例，供各动画类共享
+tween_engine = TweenEngine()
+
+
+class Animation:
+    """动画基类"""
+
+    __slots__ = ('duration', 'start_time', 'is_finished', 'easing_func')
+
+    # 共享帧时钟（秒），由AnimationManager每帧统一采样，
+    # 避免每个动画实例每帧各自调用time.time()
+    _now = 0.0
+
+    def __init__(self, duration: float, easing_func: Callable = None):
+        """初始化动画
+
+        Args:
+            duration: 动画持续时间（秒）
+            easing_func: 缓动函数
+        """
+        self.duration = duration
+        self.start_time = Animation._now
+        self.is_finished = False
+        self.easing_func = easing_func or self._linear
+    
+    def _linear(self, t: float) -> float:
+        """线性缓动"""
+        return t
+    
+    def _ease_in_out(self, t: float) -> float:
+        """缓入缓出"""
+        return 3 * t * t - 2 * t * t * t
+    
+    def _ease_out_bounce(self, t: float) -> float:
+        """弹跳缓出（查表实现）"""
+        return _BOUNCE_TABLE[int(t * _EASE_STEPS)]
+    
+    def get_progress(self) -> float:
+        """获取动画进度 (0.0 - 1.0)"""
+        elapsed = Animation._now - self.start_time
+        progress = min(1.0, elapsed / self.duration)
+        
+        if progress >= 1.0:
+            self.is_finished = True
+        
+        return self.easing_func(progress)
+    
+    def update(self) -> bool:
+        """更新动画
+
+        Returns:
+            动画是否继续
+        """
+        return not self.is_finished
+
+    def _poll_tween(self) -> bool:
+        """读取补间完成状态，完成时释放句柄并结束动画
+
+        Returns:
+            动画是否继续
+        """
+        if tween_engine.finished[self._handle]:
+            self.is_finished = True
+            tween_engine.release(self._handle)
+            return False
+        return True
+    
+    def draw(self, screen: pygame.Surface):
+        """绘制动画"""
+        pass
+
+
+class FadeAnimation(Animation):
+    """淡入淡出动画"""
+
+    __slots__ = ('surface', 'start_alpha', 'end_alpha', 'fade_in', '_handle')
+
+    def __init__(self, surface: pygame.Surface, start_alpha: int, 
+                 end_alpha: int, duration: float, fade_in: bool = True):
+        """初始化淡入淡出动画
+        
+        Args:
+            surface: 要应用动画的表面
+            start_alpha: 起始透明度 (0-255)
+            end_alpha: 结束透明度 (0-255)
+            duration: 动画持续时间
+            fade_in: 是否为淡入动画
+        """
+        super().__init__(duration, self._ease_in_out)
+        self.surface = surface
+        self.start_alpha = start_alpha
+        self.end_alpha = end_alpha
+        self.fade_in = fade_in
+        self._handle = tween_engine.add((start_alpha, 0.0), (end_alpha, 0.0),
+                                        duration, EASE_IN_OUT)
+        
+        # 确保表面支持alpha
+        self.surface = self.surface.convert_alpha()
+    
+    def update(self) -> bool:
+        if self.is_finished:
+            return False
+        
+        self.surface.set_alpha(int(tween_engine.values[self._handle, 0]))
+        return self._poll_tween()
+    
+    def draw(self, screen: pygame.Surface):
+        """绘制淡入淡出效果"""
+        # 淡入淡出效果已经应用到surface的alpha上
+        pass
+
+
+class ScaleAnimation(Animation):
+    """缩放动画"""
+
+    __slots__ = ('start_scale', 'end_scale', 'center', 'current_scale', '_handle')
+
+    def __init__(self, start_scale: float, end_scale: float, duration: float,
+                 center: Tuple[int, int] = None):
+        """初始化缩放动画
+        
+        Args:
+            start_scale: 起始缩放比例
+            end_scale: 结束缩放比例
+            duration: 动画持续时间
+            center: 缩放中心点
+        """
+        super().__init__(duration, self._ease_out_bounce)
+        self.start_scale = start_scale
+        self.end_scale = end_scale
+        self.center = center or (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
+        self.current_scale = start_scale
+        self._handle = tween_engine.add((start_scale, 0.0), (end_scale, 0.0),
+                                        duration, EASE_OUT_BOUNCE)
+    
+    def update(self) -> bool:
+        if self.is_finished:
+            return False
+        
+        self.current_scale = float(tween_engine.values[self._handle, 0])
+        return self._poll_tween()
+    
+    def get_current_scale(self) -> float:
+        """获取当前缩放比例"""
+        return self.current_scale
+
+
+class SlideAnimation(Animation):
+    """滑动动画"""
+
+    __slots__ = ('start_pos', 'end_pos', 'current_pos', '_handle')
+
+    def __init__(self, start_pos: Tuple[int, int], end_pos: Tuple[int, int], 
+                 duration: float):
+        """初始化滑动动画
+        
+        Args:
+            start_pos: 起始位置
+            end_pos: 结束位置
+            duration: 动画持续时间
+        """
+        super().__init__(duration, self._ease_in_out)
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        self.current_pos = start_pos
+        self._handle = tween_engine.add(start_pos, end_pos, duration, EASE_IN_OUT)
+    
+    def update(self) -> bool:
+        if self.is_finished:
+            return False
+        
+        value = tween_engine.values[self._handle]
+        self.current_pos = (int(value[0]), int(value[1]))
+        return self._poll_tween()
+    
+    def get_current_pos(self) -> Tuple[int, int]:
+        """获取当前位置"""
+        return self.current_pos
+
+
+class PulseAnimation(Animation):
+    """脉冲动画"""
+
+    __slots__ = ('base_scale', 'pulse_scale', 'current_scale', '_handle')
+
+    def __init__(self, base_scale: float, pulse_scale: float, duration: float):
+        """初始化脉冲动画
+        
+        Args:
+            base_scale: 基础缩放
+            pulse_scale: 脉冲缩放
+            duration: 动画持续时间
+        """
+        super().__init__(duration)
+        self.base_scale = base_scale
+        self.pulse_scale = pulse_scale
+        self.current_scale = base_scale
+        # 脉冲动画循环播放，由补间引擎自动重置起始时间
+        self._handle = tween_engine.add((base_scale, 0.0), (pulse_scale, 0.0),
+                                        duration, EASE_PULSE, loop=True)
+    
+    def update(self) -> bool:
+        self.current_scale = float(tween_engine.values[self._handle, 0])
+        return True
+    
+    def get_current_scale(self) -> float:
+        """获取当前缩放比例"""
+        return self.current_scale
+
+
+class ParticleEffect:
+    """粒子效果"""
+
+    __slots__ = ('lifetime', 'color', 'x', 'y', 'vx', 'vy', 'life', 'size')
+
+    # 圆形粒子表面缓存，按(尺寸, 颜色, 透明度档位)共享，
+    # 避免每帧为每个粒子新建SRCALPHA表面
+    _circle_cache: Dict[Tuple[int, Tuple[int, int, int], int], pygame.Surface] = {}
+
+    # 透明度量化档位数：档位化后同档粒子可共享同一个表面，
+    # 使整个效果能通过一次blits批量调用绘制
+    _ALPHA_LEVELS = 16
+
+    @classmethod
+    def _get_circle(cls, size: int, color: Tuple[int, int, int],
+                    alpha: int) -> pygame.Surface:
+        """获取缓存的圆形粒子表面，不存在时只创建一次"""
+        bucket = min(alpha * cls._ALPHA_LEVELS // 256, cls._ALPHA_LEVELS - 1)
+        key = (size, color, bucket)
+        surface = cls._circle_cache.get(key)
+        if surface is None:
+            surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (size, size), size)
+            surface.set_alpha((bucket + 1) * 255 // cls._ALPHA_LEVELS)
+            cls._circle_cache[key] = surface
+        return surface
+
+    def __init__(self, pos: Tuple[int, int], color: Tuple[int, int, int],
+                 count: int = 10, lifetime: float = 1.0):
+        """初始化粒子效果
+        
+        Args:
+            pos: 发射位置
+            color: 粒子颜色
+            count: 粒子数量
+            lifetime: 粒子生命周期
+        """
+        self.lifetime = lifetime
+        self.color = color
+
+        # SoA布局：每个属性一个连续数组，更新时走NumPy向量化路径，
+        # 避免每个粒子一个字典的逐个Python循环
+        self.x = np.full(count, pos[0], dtype=np.float32)
+        self.y = np.full(count, pos[1], dtype=np.float32)
+        self.vx = ((np.random.random(count) - 0.5) * 200).astype(np.float32)  # 随机速度
+        self.vy = ((np.random.random(count) - 0.5) * 200).astype(np.float32)
+        self.life = np.full(count, lifetime, dtype=np.float32)
+        self.size = np.random.randint(2, 7, size=count)
+
+    def update(self, dt: float) -> bool:
+        """更新粒子
+
+        Args:
+            dt: 时间增量
+
+        Returns:
+            是否还有活跃粒子
+        """
+        # 位置、重力和生命倒数统一走积分内核
+        _integrate_particles(self.x, self.y, self.vx, self.vy, self.life,
+                             np.float32(dt))
+
+        # 压缩掉已经死亡的粒子
+        mask = self.life > 0
+        if not mask.all():
+            self.x = self.x[mask]
+            self.y = self.y[mask]
+            self.vx = self.vx[mask]
+            self.vy = self.vy[mask]
+            self.life = self.life[mask]
+            self.size = self.size[mask]
+
+        return self.x.size > 0
+
+    def draw(self, screen: pygame.Surface):
+        """绘制粒子"""
+        if self.x.size == 0:
+            return
+
+        # 透明度按剩余生命周期向量化计算
+        alphas = (self.life * (255.0 / self.lifetime)).astype(np.int32)
+        xs = self.x.astype(np.int32)
+        ys = self.y.astype(np.int32)
+
+        # 组装blit序列后一次性批量提交，整个效果只有一次SDL调用
+        color = self.color
+        get_circle = self._get_circle
+        blit_sequence = []
+        for i in range(xs.size):
+            size = int(self.size[i])
+            particle_surface = get_circle(size, color, int(alphas[i]))
+            blit_sequence.append((particle_surface,
+                                  (int(xs[i]) - size, int(ys[i]) - size)))
+
+        screen.blits(blit_sequence, doreturn=False)
+
+
+class AnimationManager:
+    """动画管理器"""
+    
+    def __init__(self):
+        """初始化动画管理器"""
+        # 确保pygame已初始化
+        if not pygame.get_init():
+            pygame.init()
+            
+        self.animations: List[Animation] = []
+        self.particle_effects: List[ParticleEffect] = []
+
+        # 初始化共享帧时钟，保证update前创建的动画也有合理的起始时间
+        Animation._now = pygame.time.get_ticks() * 0.001
+        self.last_update_time = Animation._now
+    
+    def add_animation(self, animation: Animation):
+        """添加动画"""
+        self.animations.append(animation)
+    
+    def add_particle_effect(self, effect: ParticleEffect):
+        """添加粒子效果"""
+        self.particle_effects.append(effect)
+    
+    def create_fade_in(self, surface: pygame.Surface, duration: float = 0.5) -> FadeAnimation:
+        """创建淡入动画"""
+        animation = FadeAnimation(surface, 0, 255, duration, True)
+        self.add_animation(animation)
+        return animation
+    
+    def create_fade_out(self, surface: pygame.Surface, duration: float = 0.5) -> FadeAnimation:
+        """创建淡出动画"""
+        animation = FadeAnimation(surface, 255, 0, duration, False)
+        self.add_animation(animation)
+        return animation
+    
+    def create_scale_animation(self, start_scale: float, end_scale: float, 
+                              duration: float = 0.3) -> ScaleAnimation:
+        """创建缩放动画"""
+        animation = ScaleAnimation(start_scale, end_scale, duration)
+        self.add_animation(animation)
+        return animation
+    
+    def create_slide_animation(self, start_pos: Tuple[int, int], end_pos: Tuple[int, int],
+                              duration: float = 0.5) -> SlideAnimation:
+        """创建滑动动画"""
+        animation = SlideAnimation(start_pos, end_pos, duration)
+        self.add_animation(animation)
+        return animation
+    
+    def create_pulse_animation(self, base_scale: float = 1.0, pulse_scale: float = 1.2,
+                              duration: float = 1.0) -> PulseAnimation:
+        """创建脉冲动画"""
+        animation = PulseAnimation(base_scale, pulse_scale, duration)
+        self.add_animation(animation)
+        return animation
+    
+    def create_explosion_effect(self, pos: Tuple[int, int], color: Tuple[int, int, int] = RED):
+        """创建爆炸效果"""
+        effect = ParticleEffect(pos, color, count=15, lifetime=1.5)
+        self.add_particle_effect(effect)
+    
+    def create_score_effect(self, pos: Tuple[int, int], color: Tuple[int, int, int] = GOLD):
+        """创建得分效果"""
+        effect = ParticleEffect(pos, color, count=8, lifetime=1.0)
+        self.add_particle_effect(effect)
+    
+    def update(self):
+        """更新所有动画"""
+        # 每帧只采样一次时钟，并推送给所有动画共享
+        current_time = pygame.time.get_ticks() * 0.001
+        Animation._now = current_time
+        dt = current_time - self.last_update_time
+        self.last_update_time = current_time
+
+        # 一次向量化步进推进所有补间，动画类随后只做读值
+        tween_engine.step(current_time)
+
+        # 更新动画并原地压缩存活项，避免每帧重建列表
+        animations = self.animations
+        write = 0
+        for animation in animations:
+            if animation.update():
+                animations[write] = animation
+                write += 1
+        del animations[write:]
+
+        # 更新粒子效果，同样原地压缩
+        effects = self.particle_effects
+        write = 0
+        for effect in effects:
+            if effect.update(dt):
+                effects[write] = effect
+                write += 1
+        del effects[write:]
+    
+    def draw(self, screen: pygame.Surface):
+        """绘制所有动画效果"""
+        # 绘制动画
+        for animation in self.animations:
+            animation.draw(screen)
+        
+        # 绘制粒子效果
+        for effect in self.particle_effects:
+            effect.draw(screen)
+    
+    def clear_all(self):
+        """清除所有动画"""
+        for animation in self.animations:
+            handle = getattr(animation, '_handle', None)
+            if handle is not None:
+                tween_engine.release(handle)
+        self.animations.clear()
+        self.particle_effects.clear()
+    
+    def get_animation_count(self) -> int:
+        """获取活跃动画数量"""
+        return len(self.animations) + len(self.particle_effects)
+
+
+# 全局动画管理器实例（惰性构造，首次获取时才初始化pygame）
+_animation_manager: Optional[AnimationManager] = None
+
+
+def get_animation_manager() -> AnimationManager:
+    """获取全局动画管理器实例，首次调用时构造
+
+    Returns:
+        全局AnimationManager实例
+    """
+    global _animation_manager
+    if _animation_manager is None:
+        _animation_manager = AnimationManager()
+    return _animation_manager
+
+
+def __getattr__(name):
+    """兼容旧的 `from .animation_manager import animation_manager` 写法"""
+    if name == 'animation_manager':
+        return get_animation_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
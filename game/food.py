@@ -1,205 +1,311 @@
-"""
-食物类实现
-"""
-
-import pygame
-import random
-from typing import Tuple, List, Optional
-from .constants import *
-
-
-class Food:
-    """食物类，处理食物的生成和显示"""
-    
-    # 功能性果实类型定义
-    FRUIT_TYPES = {
-        'normal': {'name': '普通果实', 'color': RED, 'probability': 0.70},
-        'special': {'name': '特殊果实', 'color': GOLD, 'probability': 0.15},
-        'double_score': {'name': '双倍分数', 'color': (255, 100, 255), 'probability': 0.05},
-        'speed_up': {'name': '速度提升', 'color': ORANGE, 'probability': 0.03},
-        'speed_down': {'name': '速度减慢', 'color': BLUE, 'probability': 0.03},
-        'length_double': {'name': '长度翻倍', 'color': (0, 255, 255), 'probability': 0.02},
-        'shrink': {'name': '蛇身缩短', 'color': PURPLE, 'probability': 0.015},
-        'invincible': {'name': '短暂无敌', 'color': (255, 255, 0), 'probability': 0.005}
-    }
-    
-    def __init__(self):
-        """初始化食物"""
-        self.position = self.generate_position()
-        self.fruit_type = 'normal'
-        self.special_timer = 0
-        self.special_duration = 300  # 特殊食物持续时间（帧数）
-        self.effect_data = {}  # 存储效果相关数据
-    
-    def generate_position(self) -> Tuple[int, int]:
-        """生成随机食物位置
-        
-        Returns:
-            食物位置坐标元组 (x, y)
-        """
-        x = random.randint(0, GRID_WIDTH - 1)
-        y = random.randint(0, GRID_HEIGHT - 1)
-        return (x, y)
-    
-    def respawn(self, snake_body: List[Tuple[int, int]], hazard_positions: List[Tuple[int, int]] = None):
-        """重新生成食物位置，确保不与蛇身和危险区域重叠
-        
-        Args:
-            snake_body: 蛇身体坐标列表
-            hazard_positions: 危险区域坐标列表
-        """
-        if hazard_positions is None:
-            hazard_positions = []
-            
-        while True:
-            new_position = self.generate_position()
-            if (new_position not in snake_body and 
-                new_position not in hazard_positions):
-                self.position = new_position
-                self._generate_fruit_type()
-                break
-    
-    def _generate_fruit_type(self):
-        """根据概率生成果实类型"""
-        rand = random.random()
-        cumulative_prob = 0
-        
-        for fruit_type, data in self.FRUIT_TYPES.items():
-            cumulative_prob += data['probability']
-            if rand <= cumulative_prob:
-                self.fruit_type = fruit_type
-                if fruit_type != 'normal':
-                    self.special_timer = self.special_duration
-                else:
-                    self.special_timer = 0
-                break
-        
-        # 初始化效果数据
-        self.effect_data = {}
-        if self.fruit_type == 'double_score':
-            self.effect_data['next_score_multiplier'] = 2.0
-        elif self.fruit_type == 'speed_up':
-            self.effect_data['speed_change'] = 5
-        elif self.fruit_type == 'speed_down':
-            self.effect_data['speed_change'] = -3
-        elif self.fruit_type == 'invincible':
-            self.effect_data['duration'] = 180  # 3秒无敌
-    
-    def draw(self, screen):
-        """绘制食物"""
-        x = self.position[0] * GRID_SIZE
-        y = self.position[1] * GRID_SIZE
-        
-        # 绘制圆形食物
-        center_x = x + GRID_SIZE // 2
-        center_y = y + GRID_SIZE // 2
-        radius = GRID_SIZE // 2 - 2
-        
-        fruit_data = self.FRUIT_TYPES[self.fruit_type]
-        color = fruit_data['color']
-        
-        if self.fruit_type != 'normal':
-            # 特殊食物：带闪烁效果
-            flash_intensity = abs((self.special_timer % 60) - 30) / 30.0
-            if isinstance(color, tuple) and len(color) == 3:
-                flash_color = (
-                    int(color[0] * (0.7 + 0.3 * flash_intensity)),
-                    int(color[1] * (0.7 + 0.3 * flash_intensity)),
-                    int(color[2] * (0.7 + 0.3 * flash_intensity))
-                )
-            else:
-                flash_color = color
-            pygame.draw.circle(screen, flash_color, (center_x, center_y), radius)
-            
-            # 特殊标记
-            if self.fruit_type == 'double_score':
-                # 双倍分数：绘制"2x"
-                font = pygame.font.Font(None, 16)
-                text = font.render("2x", True, WHITE)
-                text_rect = text.get_rect(center=(center_x, center_y))
-                screen.blit(text, text_rect)
-            elif self.fruit_type == 'speed_up':
-                # 速度提升：向上箭头
-                pygame.draw.polygon(screen, WHITE, [
-                    (center_x, center_y - 5),
-                    (center_x - 3, center_y + 2),
-                    (center_x + 3, center_y + 2)
-                ])
-            elif self.fruit_type == 'speed_down':
-                # 速度减慢：向下箭头
-                pygame.draw.polygon(screen, WHITE, [
-                    (center_x, center_y + 5),
-                    (center_x - 3, center_y - 2),
-                    (center_x + 3, center_y - 2)
-                ])
-            elif self.fruit_type == 'length_double':
-                # 长度翻倍：绘制"+"
-                pygame.draw.line(screen, WHITE, (center_x - 4, center_y), (center_x + 4, center_y), 2)
-                pygame.draw.line(screen, WHITE, (center_x, center_y - 4), (center_x, center_y + 4), 2)
-            elif self.fruit_type == 'shrink':
-                # 蛇身缩短：绘制"-"
-                pygame.draw.line(screen, WHITE, (center_x - 4, center_y), (center_x + 4, center_y), 2)
-            elif self.fruit_type == 'invincible':
-                # 无敌：绘制星形
-                points = []
-                for i in range(5):
-                    angle = i * 72 - 90
-                    outer_x = center_x + int(4 * pygame.math.Vector2(1, 0).rotate(angle).x)
-                    outer_y = center_y + int(4 * pygame.math.Vector2(1, 0).rotate(angle).y)
-                    points.append((outer_x, outer_y))
-                pygame.draw.polygon(screen, WHITE, points)
-            
-            # 特殊高光
-            pygame.draw.circle(screen, WHITE, (center_x - 2, center_y - 2), radius // 4)
-        else:
-            # 普通食物：红色
-            pygame.draw.circle(screen, color, (center_x, center_y), radius)
-            # 添加高光效果
-            pygame.draw.circle(screen, WHITE, (center_x - 3, center_y - 3), radius // 3)
-    
-    def get_position(self):
-        """获取食物位置"""
-        return self.position
-    
-    def update(self):
-        """更新食物状态"""
-        if self.fruit_type != 'normal' and self.special_timer > 0:
-            old_timer = self.special_timer
-            self.special_timer -= 1
-            if self.special_timer <= 0:
-                self.fruit_type = 'normal'
-                # 特殊食物状态改变时标记为脏区域
-                from .render_optimizer import render_optimizer
-                render_optimizer.mark_dirty_grid(self.position[0], self.position[1])
-            elif old_timer % 10 == 0:  # 每10帧更新一次闪烁效果
-                from .render_optimizer import render_optimizer
-                render_optimizer.mark_dirty_grid(self.position[0], self.position[1])
-    
-    def get_value(self):
-        """获取食物分值"""
-        if self.fruit_type == 'special':
-            return 20
-        elif self.fruit_type in ['double_score', 'length_double', 'invincible']:
-            return 30
-        elif self.fruit_type in ['speed_up', 'speed_down']:
-            return 15
-        elif self.fruit_type == 'shrink':
-            return 5  # 负面效果，分数较低
-        else:
-            return 10  # 普通食物
-    
-    def get_growth(self):
-        """获取食物导致的增长段数"""
-        if self.fruit_type == 'special':
-            return 2  # 特殊果实增加2段
-        elif self.fruit_type == 'length_double':
-            return 0  # 长度翻倍果实通过特殊效果处理
-        else:
-            return 1  # 普通果实增加1段
-    
-    def get_effect(self):
-        """获取食物效果"""
-        return {
-            'type': self.fruit_type,
-            'data': self.effect_data.copy()
-        }
\ No newline at end of file
+"""
+食物类实现
+"""
+
+import bisect
+import itertools
+import math
+import pygame
+import random
+from typing import Dict, Tuple, List, Optional
+from .constants import *
+from .render_optimizer import render_optimizer
+
+
+# "2x"文字表面延迟初始化一次后复用，避免重复构造Font和栅格化字形
+_double_score_text = None
+
+
+def _get_double_score_text() -> pygame.Surface:
+    """获取缓存的"2x"文字表面，首次调用时渲染"""
+    global _double_score_text
+    if _double_score_text is None:
+        font = pygame.font.Font(None, 16)
+        _double_score_text = font.render("2x", True, WHITE)
+    return _double_score_text
+
+
+# 无敌星形的五个顶点偏移，模块加载时用math算好，省去向量对象和旋转
+_STAR_OFFSETS = tuple(
+    (round(4 * math.cos(math.radians(i * 72 - 90))),
+     round(4 * math.sin(math.radians(i * 72 - 90))))
+    for i in range(5)
+)
+
+
+def _build_flash_colors(color):
+    """为一种果实颜色预计算60帧周期的闪烁颜色表"""
+    return tuple(
+        (int(color[0] * (0.7 + 0.3 * abs(i - 30) / 30.0)),
+         int(color[1] * (0.7 + 0.3 * abs(i - 30) / 30.0)),
+         int(color[2] * (0.7 + 0.3 * abs(i - 30) / 30.0)))
+        for i in range(60)
+    )
+
+
+class Food:
+    """食物类，处理食物的生成和显示"""
+    
+    # 功能性果实类型定义
+    FRUIT_TYPES = {
+        'normal': {'name': '普通果实', 'color': RED, 'probability': 0.70},
+        'special': {'name': '特殊果实', 'color': GOLD, 'probability': 0.15},
+        'double_score': {'name': '双倍分数', 'color': (255, 100, 255), 'probability': 0.05},
+        'speed_up': {'name': '速度提升', 'color': ORANGE, 'probability': 0.03},
+        'speed_down': {'name': '速度减慢', 'color': BLUE, 'probability': 0.03},
+        'length_double': {'name': '长度翻倍', 'color': (0, 255, 255), 'probability': 0.02},
+        'shrink': {'name': '蛇身缩短', 'color': PURPLE, 'probability': 0.015},
+        'invincible': {'name': '短暂无敌', 'color': (255, 255, 0), 'probability': 0.005}
+    }
+
+    # 全部网格坐标，作为满盘时补集采样的候选池
+    _ALL_CELLS = tuple((x, y) for x in range(GRID_WIDTH) for y in range(GRID_HEIGHT))
+
+    # 果实类型的累积概率表，配合bisect做O(log k)的C级查找
+    _FRUIT_NAMES = tuple(FRUIT_TYPES)
+    _FRUIT_CDF = tuple(itertools.accumulate(
+        data['probability'] for data in FRUIT_TYPES.values()))
+
+    # 预渲染的果实精灵缓存，键为(果实类型, 闪烁档位)
+    _FLASH_BUCKETS = 8
+    _sprite_cache: Dict[Tuple[str, int], pygame.Surface] = {}
+
+    # 效果数据模板：内容固定，调用方只读，直接共享同一对象
+    # 省去每次刷新时的dict分配（普通果实占70%，effect_data总是空）
+    _EMPTY_EFFECT: Dict = {}
+    _EFFECT_TEMPLATES = {
+        'double_score': {'next_score_multiplier': 2.0},
+        'speed_up': {'speed_change': 5},
+        'speed_down': {'speed_change': -3},
+        'invincible': {'duration': 180},  # 3秒无敌
+    }
+
+    def __init__(self):
+        """初始化食物"""
+        self.position = self.generate_position()
+        self.fruit_type = 'normal'
+        self.special_timer = 0
+        self.special_duration = 300  # 特殊食物持续时间（帧数）
+        self.effect_data = self._EMPTY_EFFECT  # 存储效果相关数据（共享只读模板）
+        self._last_flash_bucket = 0  # 上次绘制用的闪烁档位
+    
+    @property
+    def position(self) -> Tuple[int, int]:
+        """当前食物位置"""
+        return self._position
+
+    @position.setter
+    def position(self, value: Tuple[int, int]):
+        # 同步维护打包成单个整数的位置键，供引擎做一次C级比较
+        self._position = value
+        self.pos_key = value[1] * GRID_WIDTH + value[0]
+
+    def generate_position(self) -> Tuple[int, int]:
+        """生成随机食物位置
+        
+        Returns:
+            食物位置坐标元组 (x, y)
+        """
+        x = random.randint(0, GRID_WIDTH - 1)
+        y = random.randint(0, GRID_HEIGHT - 1)
+        return (x, y)
+    
+    def respawn(self, snake_body: List[Tuple[int, int]], hazard_positions: List[Tuple[int, int]] = None,
+                snake_body_set: Optional[set] = None):
+        """重新生成食物位置，确保不与蛇身和危险区域重叠
+
+        Args:
+            snake_body: 蛇身体坐标列表
+            hazard_positions: 危险区域坐标列表
+            snake_body_set: 调用方已有的蛇身集合，可省去一次重建
+        """
+        # 调用方给了现成集合且没有危险区域时直接引用，不再复制
+        base = snake_body_set if snake_body_set is not None else set(snake_body)
+        if hazard_positions:
+            occupied = set(base)
+            occupied.update(hazard_positions)
+        else:
+            occupied = base
+
+        new_position = None
+        if len(occupied) * 2 < len(self._ALL_CELLS):
+            # 棋盘还比较空时，少量随机重试即可命中空位；
+            # 重试次数有上界，保证最坏情况不会退化成长循环
+            for _ in range(8):
+                candidate = self.generate_position()
+                if candidate not in occupied:
+                    new_position = candidate
+                    break
+
+        if new_position is None:
+            # 占用过半或重试未命中时，直接从空闲格采样
+            free_cells = [cell for cell in self._ALL_CELLS if cell not in occupied]
+            if not free_cells:
+                return  # 没有空位，保持原位置
+            new_position = random.choice(free_cells)
+
+        self.position = new_position
+        self._generate_fruit_type()
+    
+    def _generate_fruit_type(self):
+        """根据概率生成果实类型"""
+        # 在累积概率表上二分查找，代替每次遍历字典累加
+        index = bisect.bisect_left(self._FRUIT_CDF, random.random())
+        if index >= len(self._FRUIT_NAMES):
+            index = len(self._FRUIT_NAMES) - 1  # 防御浮点求和误差
+        self.fruit_type = self._FRUIT_NAMES[index]
+        self.special_timer = self.special_duration if self.fruit_type != 'normal' else 0
+        
+        # 效果数据取共享模板，没有对应模板的类型共用同一个空dict
+        self.effect_data = self._EFFECT_TEMPLATES.get(self.fruit_type, self._EMPTY_EFFECT)
+    
+    @classmethod
+    def _get_sprite(cls, fruit_type: str, flash_bucket: int) -> pygame.Surface:
+        """获取缓存的果实精灵，缺失时渲染一次并缓存
+
+        Args:
+            fruit_type: 果实类型
+            flash_bucket: 闪烁档位 (0 ~ _FLASH_BUCKETS-1)
+
+        Returns:
+            完整的果实精灵表面
+        """
+        key = (fruit_type, flash_bucket)
+        sprite = cls._sprite_cache.get(key)
+        if sprite is None:
+            sprite = cls._render_sprite(fruit_type, flash_bucket)
+            cls._sprite_cache[key] = sprite
+        return sprite
+
+    @classmethod
+    def _render_sprite(cls, fruit_type: str, flash_bucket: int) -> pygame.Surface:
+        """把一种果实的圆形、图标和高光渲染到独立表面上
+
+        Args:
+            fruit_type: 果实类型
+            flash_bucket: 闪烁档位
+
+        Returns:
+            渲染好的精灵表面
+        """
+        sprite = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
+        center_x = GRID_SIZE // 2
+        center_y = GRID_SIZE // 2
+        radius = GRID_SIZE // 2 - 2
+
+        if fruit_type != 'normal':
+            # 用档位中点对应的闪烁颜色渲染
+            flash_index = flash_bucket * 60 // cls._FLASH_BUCKETS
+            flash_color = _FLASH_COLORS[fruit_type][flash_index]
+            pygame.draw.circle(sprite, flash_color, (center_x, center_y), radius)
+
+            # 特殊标记
+            if fruit_type == 'double_score':
+                # 双倍分数：绘制"2x"
+                text = _get_double_score_text()
+                text_rect = text.get_rect(center=(center_x, center_y))
+                sprite.blit(text, text_rect)
+            elif fruit_type == 'speed_up':
+                # 速度提升：向上箭头
+                pygame.draw.polygon(sprite, WHITE, [
+                    (center_x, center_y - 5),
+                    (center_x - 3, center_y + 2),
+                    (center_x + 3, center_y + 2)
+                ])
+            elif fruit_type == 'speed_down':
+                # 速度减慢：向下箭头
+                pygame.draw.polygon(sprite, WHITE, [
+                    (center_x, center_y + 5),
+                    (center_x - 3, center_y - 2),
+                    (center_x + 3, center_y - 2)
+                ])
+            elif fruit_type == 'length_double':
+                # 长度翻倍：绘制"+"
+                pygame.draw.line(sprite, WHITE, (center_x - 4, center_y), (center_x + 4, center_y), 2)
+                pygame.draw.line(sprite, WHITE, (center_x, center_y - 4), (center_x, center_y + 4), 2)
+            elif fruit_type == 'shrink':
+                # 蛇身缩短：绘制"-"
+                pygame.draw.line(sprite, WHITE, (center_x - 4, center_y), (center_x + 4, center_y), 2)
+            elif fruit_type == 'invincible':
+                # 无敌：绘制星形（顶点偏移已在模块级算好）
+                points = [(center_x + dx, center_y + dy) for dx, dy in _STAR_OFFSETS]
+                pygame.draw.polygon(sprite, WHITE, points)
+
+            # 特殊高光
+            pygame.draw.circle(sprite, WHITE, (center_x - 2, center_y - 2), radius // 4)
+        else:
+            # 普通食物：红色
+            pygame.draw.circle(sprite, RED, (center_x, center_y), radius)
+            # 添加高光效果
+            pygame.draw.circle(sprite, WHITE, (center_x - 3, center_y - 3), radius // 3)
+
+        return sprite
+
+    def draw(self, screen):
+        """绘制食物"""
+        # 精灵按(类型, 闪烁档位)缓存，每帧只剩一次blit
+        if self.fruit_type != 'normal':
+            flash_bucket = (self.special_timer % 60) * self._FLASH_BUCKETS // 60
+        else:
+            flash_bucket = 0
+        sprite = self._get_sprite(self.fruit_type, flash_bucket)
+        screen.blit(sprite, (self.position[0] * GRID_SIZE, self.position[1] * GRID_SIZE))
+    
+    def get_position(self):
+        """获取食物位置"""
+        return self.position
+    
+    def update(self):
+        """更新食物状态"""
+        if self.fruit_type != 'normal' and self.special_timer > 0:
+            self.special_timer -= 1
+            if self.special_timer <= 0:
+                self.fruit_type = 'normal'
+                # 特殊食物状态改变时标记为脏区域
+                render_optimizer.mark_dirty_grid(self.position[0], self.position[1])
+            else:
+                # 闪烁精灵按档位缓存，只有档位变化时画面才会变
+                bucket = (self.special_timer % 60) * self._FLASH_BUCKETS // 60
+                if bucket != self._last_flash_bucket:
+                    self._last_flash_bucket = bucket
+                    render_optimizer.mark_dirty_grid(self.position[0], self.position[1])
+    
+    def get_value(self):
+        """获取食物分值"""
+        if self.fruit_type == 'special':
+            return 20
+        elif self.fruit_type in ['double_score', 'length_double', 'invincible']:
+            return 30
+        elif self.fruit_type in ['speed_up', 'speed_down']:
+            return 15
+        elif self.fruit_type == 'shrink':
+            return 5  # 负面效果，分数较低
+        else:
+            return 10  # 普通食物
+    
+    def get_growth(self):
+        """获取食物导致的增长段数"""
+        if self.fruit_type == 'special':
+            return 2  # 特殊果实增加2段
+        elif self.fruit_type == 'length_double':
+            return 0  # 长度翻倍果实通过特殊效果处理
+        else:
+            return 1  # 普通果实增加1段
+    
+    def get_effect(self):
+        """获取食物效果
+
+        data为共享的只读模板，调用方只通过get()读取，不再每次复制。
+        """
+        return {
+            'type': self.fruit_type,
+            'data': self.effect_data
+        }
+
+
+# 按果实类型预计算的闪烁颜色查找表，draw中按 special_timer % 60 索引
+_FLASH_COLORS = {
+    fruit_type: _build_flash_colors(data['color'])
+    for fruit_type, data in Food.FRUIT_TYPES.items()
+    if fruit_type != 'normal'
+}
\ No newline at end of file
@@ -1,795 +1,1084 @@
-"""
-游戏引擎主类
-"""
-
-import pygame
-import sys
-import json
-import random
-import time
-from typing import Dict, List, Tuple, Optional, Any, Set, Union
-from .constants import *
-from .snake import Snake
-from .food import Food
-from .sound_manager import SoundManager
-from utils.helpers import load_high_score, save_high_score
-
-# 确保pygame初始化
-pygame.init()
-pygame.font.init()
-
-# 导入管理器实例
-from .resource_manager import resource_manager
-from .render_optimizer import render_optimizer
-from .save_manager import save_manager
-from .game_modes import game_mode_manager
-from .achievement_system import achievement_system
-from .animation_manager import animation_manager
-from .input_manager import input_manager
-
-
-class GameEngine:
-    """游戏引擎主类，负责游戏逻辑和渲染"""
-    
-    def __init__(self, initial_fps: Optional[int] = None, 
-                initial_snake_length: Optional[int] = None, 
-                sound_enabled: Optional[bool] = None, 
-                show_grid: Optional[bool] = None):
-        """初始化游戏引擎"""
-        # pygame已在模块级别初始化
-        
-        # 使用统一的配置管理器
-        from game_config import game_config
-        self.config = game_config
-        
-        # 应用传入的参数覆盖配置
-        if initial_fps is not None:
-            self.config.config['game_settings']['initial_fps'] = initial_fps
-        if initial_snake_length is not None:
-            self.config.config['game_settings']['initial_snake_length'] = initial_snake_length
-        if sound_enabled is not None:
-            self.config.config['sound_settings']['enabled'] = sound_enabled
-        if show_grid is not None:
-            self.config.config['game_settings']['show_grid'] = show_grid
-        
-        # 创建游戏窗口
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("贪吃蛇游戏 - Snake Game")
-        
-        # 创建时钟对象
-        self.clock = pygame.time.Clock()
-        
-        # 使用资源管理器获取字体
-        self.font = resource_manager.get_font('system', FONT_SIZE)
-        self.small_font = resource_manager.get_font('system', SMALL_FONT_SIZE)
-        
-        # 预加载常用文本
-        resource_manager.preload_game_texts()
-        
-        # 游戏对象
-        self.snake = Snake(self.config.get('game_settings', 'initial_snake_length'))
-        self.food = Food()
-        
-        # 游戏状态
-        self.state = GAME_RUNNING
-        self.score = 0
-        self.high_score = load_high_score() # 加载最高分
-        
-        # 功能性果实效果
-        self.active_effects = {}
-        self.next_score_multiplier = 1.0  # 下一次得分的倍数
-        self.invincible_timer = 0  # 无敌时间
-        
-        # 游戏速度相关
-        self.current_fps = self.config.get('game_settings', 'initial_fps') # 初始帧率
-        self.speed_increase_interval = self.config.get('game_settings', 'speed_increase_interval') # 每X分提高一次速度
-        self.speed_increase_amount = self.config.get('game_settings', 'speed_increase_amount') # 每次提高X帧
-        self.max_fps = self.config.get('game_settings', 'max_fps') # 最大帧率
-        
-        # 游戏时间统计
-        self.start_time = pygame.time.get_ticks()
-        self.game_time = 0
-        
-        # 提示信息系统
-        self.message = ""
-        self.message_timer = 0
-        self.message_duration = 120  # 提示显示时间（帧数）
-        
-        # 输入控制优化
-        self.last_direction_change = 0
-        self.direction_change_delay = 3  # 方向改变的最小间隔（帧数）
-        
-        # 初始化音效管理器并加载音效
-        self.sound_manager = SoundManager()
-        self.sound_manager.load_sound('eat_food', 'eat.wav')
-        self.sound_manager.load_sound('game_over', 'game_over.wav')
-        
-        # 根据配置设置音效开关和音量
-        self.sound_manager.sound_enabled = self.config.get('sound_settings', 'enabled')
-        self.sound_manager.set_volume(self.config.get('sound_settings', 'volume'))
-        
-        # 确保食物不在蛇身上
-        self.food.respawn(self.snake.body)
-        
-        # 初始化时标记全屏更新
-        render_optimizer.mark_full_update()
-        
-        # 启动当前游戏模式
-        game_mode_manager.start_current_mode(self)
-        
-        # 设置输入回调
-        self._setup_input_callbacks()
-        
-        # 控制是否返回设置界面
-        self._return_to_settings = False
-    
-    def handle_events(self) -> bool:
-        """处理游戏事件
-        
-        Returns:
-            是否继续游戏
-        """
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            
-            # 使用输入管理器处理事件
-            if input_manager.handle_event(event):
-                continue  # 事件已被处理
-            
-            # 处理其他事件
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return False
-        
-        # 更新输入管理器
-        input_manager.update()
-        
-        return True
-    
-    def update(self):
-        """更新游戏逻辑"""
-        if self.state == GAME_RUNNING:
-            # 更新游戏时间
-            self.game_time = (pygame.time.get_ticks() - self.start_time) // 1000
-            
-            # 更新游戏模式
-            if not game_mode_manager.update_current_mode(self):
-                return  # 游戏模式要求结束
-            
-            # 更新蛇的位置
-            self.snake.update()
-            # 更新食物状态
-            self.food.update()
-            # 更新提示信息
-            if self.message_timer > 0:
-                self.message_timer -= 1
-            
-            # 更新动画
-            animation_manager.update()
-            
-            # 更新功能性果实效果
-            self._update_fruit_effects()
-            
-            # 检查是否吃到食物
-            if self.snake.get_head_position() == self.food.get_position():
-                # 标记旧食物位置为脏区域
-                old_food_pos = self.food.get_position()
-                render_optimizer.mark_dirty_grid(old_food_pos[0], old_food_pos[1])
-                
-                # 获取食物效果
-                food_effect = self.food.get_effect()
-                
-                # 获取食物的增长段数
-                growth = self.food.get_growth()
-                
-                # 根据增长段数多次调用eat_food
-                for _ in range(growth):
-                    self.snake.eat_food()
-                
-                food_value = self.food.get_value()
-                
-                # 应用功能性果实的分数倍数
-                fruit_multiplier = self.next_score_multiplier
-                self.next_score_multiplier = 1.0  # 重置
-                
-                # 应用游戏模式分数倍数
-                mode_multiplier = game_mode_manager.get_current_mode().get_score_multiplier()
-                final_score = int(food_value * mode_multiplier * fruit_multiplier)
-                self.score += final_score
-                
-                # 处理功能性果实效果
-                self._apply_fruit_effect(food_effect)
-                
-                # 显示得分提示和动画效果
-                food_pos_pixel = (old_food_pos[0] * GRID_SIZE + GRID_SIZE // 2,
-                                 old_food_pos[1] * GRID_SIZE + GRID_SIZE // 2)
-                
-                if fruit_multiplier > 1.0:
-                    self.show_message(f"双倍分数! +{final_score}分!", (255, 100, 255))
-                    animation_manager.create_score_effect(food_pos_pixel, (255, 100, 255))
-                elif food_value > 10:
-                    self.show_message(f"特殊食物! +{final_score}分!", GOLD)
-                    animation_manager.create_score_effect(food_pos_pixel, GOLD)
-                else:
-                    self.show_message(f"+{final_score}分", WHITE)
-                    animation_manager.create_score_effect(food_pos_pixel, GREEN)
-                
-                # 获取危险区域位置（用于生存模式）
-                hazard_positions = self._get_hazard_positions()
-                self.food.respawn(self.snake.body, hazard_positions)
-                
-                # 标记新食物位置为脏区域
-                new_food_pos = self.food.get_position()
-                render_optimizer.mark_dirty_grid(new_food_pos[0], new_food_pos[1])
-                
-                self.sound_manager.play_sound('eat_food') # 播放吃食物音效
-                
-                # 动态调整游戏速度
-                if self.score > 0 and self.score % self.speed_increase_interval == 0:
-                    self.current_fps = min(self.max_fps, self.current_fps + self.speed_increase_amount)
-            
-            # 检查碰撞（考虑无敌状态和禅模式穿墙）
-            current_mode = game_mode_manager.get_current_mode()
-            is_zen_mode = current_mode.name == "禅模式"
-            
-            if is_zen_mode:
-                # 禅模式：处理穿墙效果
-                if self.snake.handle_wall_wrap():
-                    self.show_message("穿越边界!", BLUE)
-                    current_mode.mode_data['zen_points'] = current_mode.mode_data.get('zen_points', 0) + 10
-                
-                # 禅模式只检查自身碰撞
-                if self.snake.check_collision(allow_wall_pass=True) and self.invincible_timer <= 0:
-                    self.state = GAME_OVER
-                    self.sound_manager.play_sound('game_over')
-            else:
-                # 其他模式：正常碰撞检测
-                if self.snake.check_collision() and self.invincible_timer <= 0:
-                    self.state = GAME_OVER
-                    self.sound_manager.play_sound('game_over') # 播放游戏结束音效
-                    
-                    # 标记全屏更新，确保蛇的尸体正确显示
-                    render_optimizer.mark_full_update()
-                    
-                    # 创建爆炸效果
-                    head_pos = self.snake.get_head_position()
-                    head_pos_pixel = (head_pos[0] * GRID_SIZE + GRID_SIZE // 2, 
-                                     head_pos[1] * GRID_SIZE + GRID_SIZE // 2)
-                    animation_manager.create_explosion_effect(head_pos_pixel, RED)
-                    
-                    # 更新成就统计
-                    self._update_achievements()
-                    
-                    if self.score > self.high_score:
-                        self.high_score = self.score
-                        save_high_score(self.high_score) # 保存最高分
-                    
-                    # 结束游戏模式
-                    game_mode_manager.end_current_mode(self)
-                    
-                    # 显示游戏结束消息
-                    self.show_message("游戏结束!", RED)
-                    
-                    # 根据用户要求，游戏结束时自动返回设置界面（主菜单）
-                    self._return_to_settings = True
-    
-    def draw(self):
-        """绘制游戏画面"""
-        # 清空屏幕
-        self.screen.fill(BLACK)
-        
-        if self.state == GAME_RUNNING:
-            # 绘制网格线（可选，根据配置决定）
-            if self.config.get('game_settings', 'show_grid'):
-                self.draw_grid()
-            
-            # 绘制蛇和食物
-            self.snake.draw(self.screen)
-            self.food.draw(self.screen)
-            
-            # 绘制环境危险（生存模式）
-            self._draw_environmental_hazards()
-            
-            # 绘制分数
-            self.draw_score()
-        
-        elif self.state == GAME_PAUSED:
-            # 绘制游戏内容（暂停时仍显示游戏画面）
-            if self.config.get('game_settings', 'show_grid'):
-                self.draw_grid()
-            self.snake.draw(self.screen)
-            self.food.draw(self.screen)
-            self.draw_score()
-            # 绘制暂停覆盖层
-            self.draw_paused()
-        
-        elif self.state == GAME_OVER:
-            # 绘制游戏结束画面
-            self.draw_game_over()
-        
-        # 绘制动画效果
-        animation_manager.draw(self.screen)
-        
-        # 使用渲染优化器更新显示
-        render_optimizer.update_display(self.screen)
-    
-    def draw_grid(self):
-        """绘制网格线"""
-        for x in range(0, WINDOW_WIDTH, GRID_SIZE):
-            pygame.draw.line(self.screen, GRAY, (x, 0), (x, WINDOW_HEIGHT))
-        for y in range(0, WINDOW_HEIGHT, GRID_SIZE):
-            pygame.draw.line(self.screen, GRAY, (0, y), (WINDOW_WIDTH, y))
-    
-    def draw_score(self):
-        """绘制分数"""
-        score_text = self.small_font.render(f"分数: {self.score}", True, WHITE)
-        high_score_text = self.small_font.render(f"最高分: {self.high_score}", True, WHITE)
-        length_text = self.small_font.render(f"长度: {self.snake.get_length()}", True, WHITE)
-        fps_text = self.small_font.render(f"速度: {self.current_fps} FPS", True, WHITE)
-        time_text = self.small_font.render(f"时间: {self.game_time}s", True, WHITE)
-        
-        # 获取当前游戏模式信息
-        current_mode = game_mode_manager.get_current_mode()
-        mode_text = self.small_font.render(f"模式: {current_mode.name}", True, ORANGE)
-        multiplier = current_mode.get_score_multiplier()
-        multiplier_text = self.small_font.render(f"倍数: {multiplier:.1f}x", True, GOLD)
-        
-        # 获取模式状态文本
-        status_text_content = current_mode.get_status_text()
-        if status_text_content:
-            status_text = self.small_font.render(status_text_content, True, GREEN)
-        
-        self.screen.blit(score_text, (10, 10))
-        self.screen.blit(high_score_text, (10, 35))
-        self.screen.blit(length_text, (10, 60))
-        self.screen.blit(fps_text, (10, 85))
-        self.screen.blit(time_text, (10, 110))
-        self.screen.blit(mode_text, (10, 135))
-        self.screen.blit(multiplier_text, (10, 160))
-        
-        # 绘制模式状态
-        if status_text_content:
-            self.screen.blit(status_text, (10, 185))
-        
-        # 绘制功能性果实状态
-        y_offset = 210
-        if self.next_score_multiplier > 1.0:
-            next_bonus_text = self.small_font.render(f"下次分数: {self.next_score_multiplier:.1f}x", True, (255, 100, 255))
-            self.screen.blit(next_bonus_text, (10, y_offset))
-            y_offset += 25
-        
-        if self.invincible_timer > 0:
-            invincible_text = self.small_font.render(f"无敌时间: {self.invincible_timer // 60 + 1}s", True, (255, 255, 0))
-            self.screen.blit(invincible_text, (10, y_offset))
-        
-        # 绘制提示信息
-        if self.message_timer > 0:
-            self.draw_message()
-    
-    def draw_game_over(self):
-        """绘制游戏结束画面"""
-        # 半透明背景
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
-        
-        # 导入名言系统
-        from .quotes import get_random_quote
-        quote = get_random_quote()
-        
-        # 游戏结束文本
-        game_over_text = self.font.render("游戏结束!", True, RED)
-        score_text = self.font.render(f"最终分数: {self.score}", True, WHITE)
-        high_score_text = self.font.render(f"最高分: {self.high_score}", True, WHITE)
-        
-        # 名言显示（可能需要分行）
-        quote_words = quote.split()
-        quote_lines = []
-        current_line = ""
-        
-        for word in quote_words:
-            if len(current_line + " " + word) > 60:  # 控制每行字符数
-                quote_lines.append(current_line)
-                current_line = word
-            else:
-                current_line = current_line + " " + word if current_line else word
-        
-        if current_line:
-            quote_lines.append(current_line)
-            
-        # 操作提示
-        restart_text = self.small_font.render("按空格键重新开始", True, WHITE)
-        settings_text = self.small_font.render("按R键返回设置", True, ORANGE)
-        quit_text = self.small_font.render("按ESC键退出", True, WHITE)
-        
-        # 居中显示文本
-        texts = [game_over_text, score_text, high_score_text]
-        
-        # 添加名言
-        for line in quote_lines:
-            quote_text = self.small_font.render(line, True, GOLD)
-            texts.append(quote_text)
-            
-        # 添加操作提示
-        texts.extend([restart_text, settings_text, quit_text])
-        
-        y_offset = WINDOW_HEIGHT // 2 - len(texts) * 30 // 2
-        
-        for i, text in enumerate(texts):
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, y_offset + i * 35))
-            self.screen.blit(text, text_rect)
-    
-    def restart_game(self):
-        """重新开始游戏"""
-        self.snake.reset()
-        self.food.respawn(self.snake.body)
-        self.score = 0
-        self.state = GAME_RUNNING
-        # 重置游戏速度到初始值
-        self.current_fps = self.config.get('game_settings', 'initial_fps')
-        # 重置游戏时间
-        self.start_time = pygame.time.get_ticks()
-        self.game_time = 0
-        # 清除提示信息
-        self.message = ""
-        self.message_timer = 0
-        
-        # 重新启动游戏模式
-        game_mode_manager.start_current_mode(self)
-    
-    
-    def draw_paused(self):
-        """绘制暂停画面"""
-        # 半透明背景
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
-        
-        # 暂停文本
-        paused_text = self.font.render("游戏暂停", True, WHITE)
-        resume_text = self.small_font.render("按P键继续", True, WHITE)
-        
-        # 居中显示文本
-        texts = [paused_text, resume_text]
-        y_offset = WINDOW_HEIGHT // 2 - len(texts) * 30 // 2
-        
-        for i, text in enumerate(texts):
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, y_offset + i * 40))
-            self.screen.blit(text, text_rect)
-    
-    def run(self):
-        """运行游戏主循环"""
-        running = True
-        
-        while running:
-            # 处理事件
-            running = self.handle_events()
-            
-            # 更新游戏逻辑
-            self.update()
-            
-            # 绘制画面
-            self.draw()
-            
-            # 如果游戏结束，显示游戏结束画面，但不立即退出
-            if self.state == GAME_OVER:
-                # 绘制游戏结束画面
-                self.draw_game_over()
-                pygame.display.flip()
-                
-                # 等待用户按键
-                waiting_for_key = True
-                while waiting_for_key and running:
-                    for event in pygame.event.get():
-                        if event.type == pygame.QUIT:
-                            running = False
-                            waiting_for_key = False
-                        elif event.type == pygame.KEYDOWN:
-                            if event.key == pygame.K_ESCAPE:
-                                running = False
-                                waiting_for_key = False
-                            elif event.key == pygame.K_r:
-                                self._return_to_settings = True
-                                running = False
-                                waiting_for_key = False
-                            elif event.key == pygame.K_SPACE:
-                                self.restart_game()
-                                waiting_for_key = False
-                    
-                    # 控制帧率
-                    self.clock.tick(10)  # 降低帧率以减少CPU使用
-            
-            # 控制帧率
-            self.clock.tick(self.current_fps) # 使用动态帧率
-        
-        return self._return_to_settings
-    
-    def show_message(self, text: str, color: Tuple[int, int, int] = WHITE):
-        """显示提示信息
-        
-        Args:
-            text: 提示文本
-            color: 文本颜色
-        """
-        self.message = text
-        self.message_color = color
-        self.message_timer = self.message_duration
-    
-    def draw_message(self):
-        """绘制提示信息"""
-        if self.message:
-            message_surface = self.small_font.render(self.message, True, self.message_color)
-            # 居中显示在屏幕上方
-            x = (WINDOW_WIDTH - message_surface.get_width()) // 2
-            y = 150
-            self.screen.blit(message_surface, (x, y))
-    
-    def save_game(self, slot_name: str = None) -> bool:
-        """保存游戏状态
-        
-        Args:
-            slot_name: 存档槽名称
-            
-        Returns:
-            是否保存成功
-        """
-        try:
-            game_state = {
-                'score': self.score,
-                'snake_body': self.snake.body,
-                'snake_direction': self.snake.direction,
-                'food_position': self.food.position,
-                'food_is_special': self.food.is_special,
-                'food_special_timer': self.food.special_timer,
-                'current_fps': self.current_fps,
-                'game_time': self.game_time,
-                'snake_length': self.snake.get_length(),
-                'difficulty': game_mode_manager.get_current_mode().name,
-                'mode_data': game_mode_manager.get_current_mode().mode_data
-            }
-            
-            success = save_manager.save_game(game_state, slot_name)
-            if success:
-                self.show_message("游戏已保存!", GREEN)
-            else:
-                self.show_message("保存失败!", RED)
-            return success
-            
-        except Exception as e:
-            print(f"保存游戏失败: {e}")
-            self.show_message("保存失败!", RED)
-            return False
-    
-    def load_game(self, slot_name: str) -> bool:
-        """加载游戏状态
-        
-        Args:
-            slot_name: 存档槽名称
-            
-        Returns:
-            是否加载成功
-        """
-        try:
-            game_state = save_manager.load_game(slot_name)
-            if not game_state:
-                self.show_message("加载失败!", RED)
-                return False
-            
-            # 恢复游戏状态
-            self.score = game_state.get('score', 0)
-            self.snake.body = game_state.get('snake_body', [(10, 10)])
-            self.snake.direction = tuple(game_state.get('snake_direction', RIGHT))
-            self.snake.next_direction = self.snake.direction
-            
-            self.food.position = tuple(game_state.get('food_position', (15, 15)))
-            self.food.is_special = game_state.get('food_is_special', False)
-            self.food.special_timer = game_state.get('food_special_timer', 0)
-            
-            self.current_fps = game_state.get('current_fps', 10)
-            self.game_time = game_state.get('game_time', 0)
-            
-            # 恢复游戏模式数据
-            mode_data = game_state.get('mode_data', {})
-            game_mode_manager.get_current_mode().mode_data = mode_data
-            
-            self.state = GAME_RUNNING
-            self.start_time = pygame.time.get_ticks() - self.game_time * 1000
-            
-            self.show_message("游戏已加载!", GREEN)
-            render_optimizer.mark_full_update()
-            return True
-            
-        except Exception as e:
-            print(f"加载游戏失败: {e}")
-            self.show_message("加载失败!", RED)
-            return False
-    
-    def _update_achievements(self):
-        """更新成就统计"""
-        try:
-            # 更新统计数据
-            achievement_system.update_stats(
-                total_games=1,
-                total_score=self.score,
-                highest_score=self.score,
-                max_snake_length=self.snake.get_length(),
-                max_game_time=self.game_time
-            )
-            
-            # 保存成就进度
-            achievement_system.save_achievements()
-            
-        except Exception as e:
-            print(f"更新成就失败: {e}")
-    
-    def _setup_input_callbacks(self):
-        """设置输入回调"""
-        # 设置方向改变回调
-        input_manager.set_direction_callback(self._on_direction_change)
-        
-        # 设置暂停键
-        input_manager.set_key_callback(pygame.K_p, self._toggle_pause)
-        
-        # 设置游戏结束时的按键
-        input_manager.set_key_callback(pygame.K_SPACE, self._on_space_key)
-        input_manager.set_key_callback(pygame.K_r, self._on_return_key)
-        input_manager.set_key_callback(pygame.K_s, self._on_save_key)
-        
-        # 设置方向改变延迟
-        input_manager.set_direction_change_delay(0.05)
-    
-    def _on_direction_change(self, direction):
-        """方向改变回调"""
-        if self.state == GAME_RUNNING:
-            self.snake.change_direction(direction)
-    
-    def _toggle_pause(self):
-        """切换暂停状态"""
-        if self.state == GAME_RUNNING:
-            self.state = GAME_PAUSED
-            self.show_message("游戏暂停", WHITE)
-        elif self.state == GAME_PAUSED:
-            self.state = GAME_RUNNING
-            self.show_message("游戏继续", WHITE)
-    
-    def _on_space_key(self):
-        """空格键回调"""
-        pass # 清空原有逻辑
-    
-    def _on_return_key(self):
-        """返回键回调"""
-        pass # 清空原有逻辑
-    
-    def _on_save_key(self):
-        """保存键回调"""
-        if self.state == GAME_OVER:
-            self.save_game()
-    
-    def _update_fruit_effects(self):
-        """更新功能性果实效果"""
-        # 更新无敌时间
-        if self.invincible_timer > 0:
-            self.invincible_timer -= 1
-            if self.invincible_timer <= 0:
-                self.show_message("无敌状态结束", WHITE)
-    
-    def _apply_fruit_effect(self, food_effect):
-        """应用功能性果实效果"""
-        effect_type = food_effect['type']
-        effect_data = food_effect['data']
-        
-        if effect_type == 'double_score':
-            self.next_score_multiplier = effect_data.get('next_score_multiplier', 2.0)
-            self.show_message("下一个果实双倍分数!", (255, 100, 255))
-            
-        elif effect_type == 'speed_up':
-            speed_change = effect_data.get('speed_change', 5)
-            self.current_fps = min(50, self.current_fps + speed_change)
-            self.show_message(f"速度提升! {self.current_fps} FPS", ORANGE)
-            
-        elif effect_type == 'speed_down':
-            speed_change = effect_data.get('speed_change', -3)
-            self.current_fps = max(5, self.current_fps + speed_change)
-            self.show_message(f"速度减慢! {self.current_fps} FPS", BLUE)
-            
-        elif effect_type == 'length_double':
-            # 蛇身长度翻倍
-            current_length = len(self.snake.body)
-            for _ in range(current_length):
-                self.snake.eat_food()
-            self.show_message("蛇身长度翻倍!", (0, 255, 255))
-            
-        elif effect_type == 'shrink':
-            # 蛇身缩短
-            if len(self.snake.body) > 3:
-                shrink_count = max(1, len(self.snake.body) // 3)
-                for _ in range(shrink_count):
-                    if len(self.snake.body) > 3:
-                        self.snake.body.pop()
-                self.show_message(f"蛇身缩短 -{shrink_count}节!", PURPLE)
-            
-        elif effect_type == 'invincible':
-            duration = effect_data.get('duration', 180)
-            self.invincible_timer = duration
-            self.show_message("获得无敌状态!", (255, 255, 0))
-    
-    def _get_hazard_positions(self):
-        """获取危险区域位置（用于生存模式）"""
-        hazard_positions = []
-        current_mode = game_mode_manager.get_current_mode()
-        
-        if hasattr(current_mode, 'mode_data') and 'environmental_hazards' in current_mode.mode_data:
-            for hazard in current_mode.mode_data['environmental_hazards']:
-                hazard_pos = hazard.get('position')
-                hazard_radius = hazard.get('radius', 1)
-                
-                # 添加危险区域及其周围的位置
-                for dx in range(-hazard_radius, hazard_radius + 1):
-                    for dy in range(-hazard_radius, hazard_radius + 1):
-                        pos = (hazard_pos[0] + dx, hazard_pos[1] + dy)
-                        if (0 <= pos[0] < GRID_WIDTH and 0 <= pos[1] < GRID_HEIGHT):
-                            hazard_positions.append(pos)
-        
-        return hazard_positions
-    
-    def _draw_environmental_hazards(self):
-        """绘制环境危险区域"""
-        current_mode = game_mode_manager.get_current_mode()
-        
-        if hasattr(current_mode, 'mode_data') and 'environmental_hazards' in current_mode.mode_data:
-            for hazard in current_mode.mode_data['environmental_hazards']:
-                hazard_pos = hazard.get('position')
-                hazard_type = hazard.get('type')
-                hazard_radius = hazard.get('radius', 1)
-                duration = hazard.get('duration', 0)
-                
-                # 计算透明度（剩余时间越少越透明）
-                max_duration = 20 * self.current_fps if hazard_type == 'speed_trap' else 15 * self.current_fps
-                alpha = min(255, int(255 * (duration / max_duration)))
-                
-                # 绘制危险区域
-                for dx in range(-hazard_radius, hazard_radius + 1):
-                    for dy in range(-hazard_radius, hazard_radius + 1):
-                        distance = abs(dx) + abs(dy)  # 曼哈顿距离
-                        if distance <= hazard_radius:
-                            x = (hazard_pos[0] + dx) * GRID_SIZE
-                            y = (hazard_pos[1] + dy) * GRID_SIZE
-                            
-                            # 检查是否在屏幕范围内
-                            if (0 <= hazard_pos[0] + dx < GRID_WIDTH and 
-                                0 <= hazard_pos[1] + dy < GRID_HEIGHT):
-                                
-                                # 创建带透明度的表面
-                                hazard_surface = pygame.Surface((GRID_SIZE, GRID_SIZE))
-                                hazard_surface.set_alpha(alpha // 2)  # 半透明效果
-                                
-                                if hazard_type == 'poison_zone':
-                                    # 毒区：紫色，带毒气效果
-                                    hazard_surface.fill(PURPLE)
-                                    self.screen.blit(hazard_surface, (x, y))
-                                    
-                                    # 添加毒气粒子效果
-                                    if duration % 20 < 10:  # 闪烁效果
-                                        center_x = x + GRID_SIZE // 2
-                                        center_y = y + GRID_SIZE // 2
-                                        pygame.draw.circle(self.screen, (200, 0, 200), 
-                                                         (center_x, center_y), 3)
-                                
-                                elif hazard_type == 'speed_trap':
-                                    # 减速陷阱：蓝色，带漩涡效果
-                                    hazard_surface.fill(BLUE)
-                                    self.screen.blit(hazard_surface, (x, y))
-                                    
-                                    # 添加漩涡效果
-                                    center_x = x + GRID_SIZE // 2
-                                    center_y = y + GRID_SIZE // 2
-                                    angle = (duration * 5) % 360
-                                    for i in range(3):
-                                        offset_angle = angle + i * 120
-                                        offset_x = int(5 * pygame.math.Vector2(1, 0).rotate(offset_angle).x)
-                                        offset_y = int(5 * pygame.math.Vector2(1, 0).rotate(offset_angle).y)
-                                        pygame.draw.circle(self.screen, WHITE, 
-                                                         (center_x + offset_x, center_y + offset_y), 2)
+"""
+游戏引擎主类
+"""
+
+import functools
+import math
+import time
+import pygame
+from typing import Dict, List, Tuple, Optional, Any, Set, Union
+from .constants import *
+from .snake import Snake
+from .food import Food
+from .sound_manager import SoundManager
+from utils.helpers import load_high_score, save_high_score
+
+# 导入管理器实例
+from .resource_manager import resource_manager
+from .render_optimizer import render_optimizer
+from .save_manager import save_manager
+from .game_modes import game_mode_manager
+from .achievement_system import get_achievement_system
+from .animation_manager import get_animation_manager
+
+# 惰性单例：在引擎构造时才创建，避免导入期的磁盘IO和pygame子系统初始化
+achievement_system = None
+animation_manager = None
+from .input_manager import input_manager
+
+
+# 漩涡粒子的偏移查找表：6度一档共60档，预先算好sin/cos
+_SWIRL_OFFSETS = tuple(
+    (int(5 * math.cos(math.radians(a))), int(5 * math.sin(math.radians(a))))
+    for a in range(0, 360, 6)
+)
+
+
+@functools.lru_cache(maxsize=512)
+def _render_value(font: pygame.font.Font, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+    """渲染HUD数值文本，相同(字体, 文本, 颜色)直接复用缓存表面"""
+    return font.render(text, True, color)
+
+
+class GameEngine:
+    """游戏引擎主类，负责游戏逻辑和渲染"""
+
+    # 每种半径的曼哈顿圆盘格子偏移，首次用到时算一次
+    _HAZARD_OFFSETS: Dict[int, Tuple[Tuple[int, int], ...]] = {}
+    
+    def __init__(self, initial_fps: Optional[int] = None, 
+                initial_snake_length: Optional[int] = None, 
+                sound_enabled: Optional[bool] = None, 
+                show_grid: Optional[bool] = None):
+        """初始化游戏引擎"""
+        # 确保pygame初始化（不在导入期做，避免import本模块就拉起SDL）
+        if not pygame.get_init():
+            pygame.init()
+        if not pygame.font.get_init():
+            pygame.font.init()
+
+        # 首次创建引擎时构造惰性单例，供本模块内的全局名使用
+        global achievement_system, animation_manager
+        achievement_system = get_achievement_system()
+        animation_manager = get_animation_manager()
+
+        # 使用统一的配置管理器
+        from game_config import game_config
+        self.config = game_config
+        
+        # 应用传入的参数覆盖配置
+        if initial_fps is not None:
+            self.config.config['game_settings']['initial_fps'] = initial_fps
+        if initial_snake_length is not None:
+            self.config.config['game_settings']['initial_snake_length'] = initial_snake_length
+        if sound_enabled is not None:
+            self.config.config['sound_settings']['enabled'] = sound_enabled
+        if show_grid is not None:
+            self.config.config['game_settings']['show_grid'] = show_grid
+        
+        # 创建游戏窗口
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("贪吃蛇游戏 - Snake Game")
+
+        # 整个游戏只用键盘：在队列源头屏蔽鼠标移动等高频事件，
+        # 每帧的事件循环不再为用不到的事件构造Python对象
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP])
+
+        # 预渲染背景：纯黑与带网格线各一张，每帧只需一次blit
+        self._plain_bg = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        self._plain_bg.fill(BLACK)
+        self._grid_bg = self._plain_bg.copy()
+        for x in range(0, WINDOW_WIDTH, GRID_SIZE):
+            pygame.draw.line(self._grid_bg, GRAY, (x, 0), (x, WINDOW_HEIGHT))
+        for y in range(0, WINDOW_HEIGHT, GRID_SIZE):
+            pygame.draw.line(self._grid_bg, GRAY, (0, y), (WINDOW_WIDTH, y))
+
+        # 半透明遮罩和覆盖层静态文本只创建一次，暂停/结束画面直接复用
+        self._dim_overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        self._dim_overlay.set_alpha(128)
+        self._dim_overlay.fill(BLACK)
+        self._overlay_texts = None  # 字体就绪后在首次使用时填充
+        self._game_over_surface = None  # 本局的游戏结束画面合成缓存
+        
+        # 创建时钟对象
+        self.clock = pygame.time.Clock()
+        
+        # 使用资源管理器获取字体
+        self.font = resource_manager.get_font('system', FONT_SIZE)
+        self.small_font = resource_manager.get_font('system', SMALL_FONT_SIZE)
+        
+        # 预加载常用文本
+        resource_manager.preload_game_texts()
+
+        # HUD各行的静态标签只渲染一次，数值部分单独走缓存
+        self._label_surfs = {
+            'score': self.small_font.render("分数: ", True, WHITE),
+            'high_score': self.small_font.render("最高分: ", True, WHITE),
+            'length': self.small_font.render("长度: ", True, WHITE),
+            'fps': self.small_font.render("速度: ", True, WHITE),
+            'time': self.small_font.render("时间: ", True, WHITE),
+            'mode': self.small_font.render("模式: ", True, ORANGE),
+            'multiplier': self.small_font.render("倍数: ", True, GOLD),
+            'next_bonus': self.small_font.render("下次分数: ", True, (255, 100, 255)),
+            'invincible': self.small_font.render("无敌时间: ", True, (255, 255, 0)),
+        }
+        
+        # 游戏对象
+        self.snake = Snake(self.config.get('game_settings', 'initial_snake_length'))
+        self.food = Food()
+        
+        # 游戏状态
+        self.state = GAME_RUNNING
+        self.score = 0
+        self.high_score = load_high_score() # 加载最高分
+        
+        # 功能性果实效果
+        self.active_effects = {}
+        self.next_score_multiplier = 1.0  # 下一次得分的倍数
+        self.invincible_timer = 0  # 无敌时间
+        
+        # 每帧要读的配置项缓存成实例属性，省去逐帧的字典链查找
+        self._show_grid = bool(self.config.get('game_settings', 'show_grid'))
+
+        # 游戏速度相关
+        self.current_fps = self.config.get('game_settings', 'initial_fps') # 初始帧率
+        self.speed_increase_interval = self.config.get('game_settings', 'speed_increase_interval') # 每X分提高一次速度
+        self.speed_increase_amount = self.config.get('game_settings', 'speed_increase_amount') # 每次提高X帧
+        self.max_fps = self.config.get('game_settings', 'max_fps') # 最大帧率
+        self._next_speed_threshold = self.speed_increase_interval  # 下次提速的分数阈值
+        
+        # 本tick的墙钟时间戳：每tick只取一次，供各游戏模式读取
+        self.frame_time = time.monotonic()
+
+        # 游戏时间统计：逻辑tick计数代替每帧的get_ticks()调用，
+        # 秒数只在跨过下一个整秒的tick阈值时递增，tick路径上无除法
+        self._tick_counter = 0
+        self._next_second_tick = self.current_fps
+        self.game_time = 0
+        
+        # 提示信息系统
+        self.message = ""
+        self.message_timer = 0
+        self.message_duration = 120  # 提示显示时间（帧数）
+
+        # 脏矩形更新辅助状态：HUD内容快照和上一帧的游戏状态
+        self._hud_state = None
+        self._last_drawn_state = None
+
+        # HUD文字表面缓存：键 -> (文本, 表面)，数值不变时跳过font.render
+        self._hud_cache = {}
+        
+        # 输入控制优化
+        self.last_direction_change = 0
+        self.direction_change_delay = 3  # 方向改变的最小间隔（帧数）
+        
+        # 初始化音效管理器并加载音效
+        self.sound_manager = SoundManager()
+        self.sound_manager.load_sound('eat_food', 'eat.wav')
+        self.sound_manager.load_sound('game_over', 'game_over.wav')
+        
+        # 根据配置设置音效开关和音量
+        self.sound_manager.sound_enabled = self.config.get('sound_settings', 'enabled')
+        self.sound_manager.set_volume(self.config.get('sound_settings', 'volume'))
+        
+        # 确保食物不在蛇身上
+        self.food.respawn(self.snake.body)
+        
+        # 初始化时标记全屏更新
+        render_optimizer.mark_full_update()
+        
+        # 启动当前游戏模式，并缓存模式引用（模式只在菜单里切换，
+        # 引擎运行期间不变，逐帧查询管理器纯属浪费）
+        game_mode_manager.start_current_mode(self)
+        self._current_mode = game_mode_manager.get_current_mode()
+        
+        # 设置输入回调
+        self._setup_input_callbacks()
+        
+        # 控制是否返回设置界面
+        self._return_to_settings = False
+
+        # 危险区域格子缓存：(危险配置键, frozenset格子)，配置不变时直接复用
+        self._hazard_cells_cache = (None, frozenset())
+
+        # 危险区域半透明填充面缓存：键为(类型, 透明度档位)
+        self._hazard_surf_cache = {}
+
+        # 当前状态下要铺的背景，状态切换时在draw()里重选
+        self._background = self._grid_bg if self._show_grid else self._plain_bg
+
+        # 主循环控制标志（字典分发的按键处理会修改它）
+        self._running = False
+
+        # 画面是否需要重绘：静止画面（如暂停且无动画）整帧跳过绘制
+        self._dirty = True
+
+        # 游戏结束画面的按键分发表：字典查找代替if/elif链
+        self._game_over_key_handlers = {
+            pygame.K_ESCAPE: self._game_over_quit,
+            pygame.K_r: self._game_over_return,
+            pygame.K_SPACE: self._game_over_restart,
+        }
+
+        # 功能性果实效果分发表：按类型O(1)查到处理方法
+        self._effect_handlers = {
+            'double_score': self._eff_double_score,
+            'speed_up': self._eff_speed_up,
+            'speed_down': self._eff_speed_down,
+            'length_double': self._eff_length_double,
+            'shrink': self._eff_shrink,
+            'invincible': self._eff_invincible,
+        }
+    
+    def handle_events(self) -> bool:
+        """处理游戏事件
+        
+        Returns:
+            是否继续游戏
+        """
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+
+            # 游戏结束画面的按键先查分发表；空格/R在输入管理器里
+            # 注册过空回调，必须在它消费之前拦截
+            if self.state == GAME_OVER and event.type == pygame.KEYDOWN:
+                handler = self._game_over_key_handlers.get(event.key)
+                if handler is not None:
+                    handler()
+                    continue
+            
+            # 使用输入管理器处理事件
+            if input_manager.handle_event(event):
+                continue  # 事件已被处理
+            
+            # 处理其他事件
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return False
+        
+        # 更新输入管理器
+        input_manager.update()
+        
+        return self._running
+    
+    def update(self):
+        """更新游戏逻辑"""
+        if self.state == GAME_RUNNING:
+            # 墙钟时间每tick只采样一次，模式逻辑统一读这份时间戳
+            self.frame_time = time.monotonic()
+
+            # 更新游戏时间：update按current_fps的逻辑步长调用，
+            # 数tick即可得秒数；只比较阈值，跨秒时才有整数加法
+            self._tick_counter += 1
+            if self._tick_counter >= self._next_second_tick:
+                self.game_time += 1
+                self._next_second_tick = self._tick_counter + self.current_fps
+            
+            # 更新游戏模式
+            if not game_mode_manager.update_current_mode(self):
+                return  # 游戏模式要求结束
+            
+            # 每帧的热路径对象提前绑定为局部变量，减少重复属性查找
+            snake = self.snake
+            food = self.food
+
+            # 更新蛇的位置
+            snake.update()
+            # 更新食物状态
+            food.update()
+            # 更新提示信息
+            if self.message_timer > 0:
+                self.message_timer -= 1
+            
+            # 更新动画
+            animation_manager.update()
+            
+            # 更新功能性果实效果
+            self._update_fruit_effects()
+            
+            # 检查是否吃到食物（打包成整数的位置键，一次比较）
+            if snake.head_key == food.pos_key:
+                # 标记旧食物位置为脏区域
+                old_food_pos = food.position
+                render_optimizer.mark_dirty_grid(old_food_pos[0], old_food_pos[1])
+                
+                # 获取食物效果
+                food_effect = food.get_effect()
+                
+                # 获取食物的增长段数
+                growth = food.get_growth()
+                
+                # 一次性累加增长段数
+                snake.grow(growth)
+                
+                food_value = food.get_value()
+                
+                # 应用功能性果实的分数倍数
+                fruit_multiplier = self.next_score_multiplier
+                self.next_score_multiplier = 1.0  # 重置
+                
+                # 应用游戏模式分数倍数
+                mode_multiplier = self._current_mode.get_score_multiplier()
+                final_score = int(food_value * mode_multiplier * fruit_multiplier)
+                self.score += final_score
+                
+                # 处理功能性果实效果
+                self._apply_fruit_effect(food_effect)
+                
+                # 显示得分提示和动画效果
+                food_pos_pixel = (old_food_pos[0] * GRID_SIZE + GRID_SIZE // 2,
+                                 old_food_pos[1] * GRID_SIZE + GRID_SIZE // 2)
+                
+                if fruit_multiplier > 1.0:
+                    self.show_message(f"双倍分数! +{final_score}分!", (255, 100, 255))
+                    animation_manager.create_score_effect(food_pos_pixel, (255, 100, 255))
+                elif food_value > 10:
+                    self.show_message(f"特殊食物! +{final_score}分!", GOLD)
+                    animation_manager.create_score_effect(food_pos_pixel, GOLD)
+                else:
+                    self.show_message(f"+{final_score}分", WHITE)
+                    animation_manager.create_score_effect(food_pos_pixel, GREEN)
+                
+                # 获取危险区域位置（用于生存模式）
+                hazard_positions = self._get_hazard_positions()
+                food.respawn(snake.body, hazard_positions,
+                             snake_body_set=snake.body_set)
+                
+                # 标记新食物位置为脏区域
+                new_food_pos = self.food.get_position()
+                render_optimizer.mark_dirty_grid(new_food_pos[0], new_food_pos[1])
+                
+                self.sound_manager.play_sound('eat_food') # 播放吃食物音效
+                
+                # 动态调整游戏速度：阈值比较代替取模，双倍分数等
+                # 一口气跨过多个阈值时也不会漏掉提速
+                while self.score >= self._next_speed_threshold:
+                    self._next_speed_threshold += self.speed_increase_interval
+                    self.current_fps = min(self.max_fps, self.current_fps + self.speed_increase_amount)
+            
+            # 检查碰撞（考虑无敌状态和禅模式穿墙）
+            current_mode = self._current_mode
+            is_zen_mode = current_mode.name == "禅模式"
+            
+            if is_zen_mode:
+                # 禅模式：处理穿墙效果
+                if self.snake.handle_wall_wrap():
+                    self.show_message("穿越边界!", BLUE)
+                    current_mode.mode_data['zen_points'] = current_mode.mode_data.get('zen_points', 0) + 10
+                
+                # 禅模式只检查自身碰撞
+                if self.snake.check_collision(allow_wall_pass=True) and self.invincible_timer <= 0:
+                    self.state = GAME_OVER
+                    self.sound_manager.play_sound('game_over')
+            else:
+                # 其他模式：正常碰撞检测
+                if self.snake.check_collision() and self.invincible_timer <= 0:
+                    self.state = GAME_OVER
+                    self.sound_manager.play_sound('game_over') # 播放游戏结束音效
+                    
+                    # 标记全屏更新，确保蛇的尸体正确显示
+                    render_optimizer.mark_full_update()
+                    
+                    # 创建爆炸效果
+                    head_pos = self.snake.get_head_position()
+                    head_pos_pixel = (head_pos[0] * GRID_SIZE + GRID_SIZE // 2, 
+                                     head_pos[1] * GRID_SIZE + GRID_SIZE // 2)
+                    animation_manager.create_explosion_effect(head_pos_pixel, RED)
+                    
+                    # 更新成就统计
+                    self._update_achievements()
+                    
+                    if self.score > self.high_score:
+                        self.high_score = self.score
+                        save_high_score(self.high_score) # 保存最高分
+                    
+                    # 结束游戏模式
+                    game_mode_manager.end_current_mode(self)
+                    
+                    # 显示游戏结束消息
+                    self.show_message("游戏结束!", RED)
+                    
+                    # 根据用户要求，游戏结束时自动返回设置界面（主菜单）
+                    self._return_to_settings = True
+    
+    def draw(self):
+        """绘制游戏画面"""
+        # 状态切换（暂停/结束覆盖层出现或消失）需要整屏重绘一次，
+        # 背景也只在此时重选：运行/暂停按配置选网格背景，其余纯黑
+        if self.state != self._last_drawn_state:
+            self._last_drawn_state = self.state
+            render_optimizer.mark_full_update()
+            if self.state in (GAME_RUNNING, GAME_PAUSED) and self._show_grid:
+                self._background = self._grid_bg
+            else:
+                self._background = self._plain_bg
+            if self.state == GAME_OVER:
+                # 每局结束重新合成一次结束画面（分数和名言都变了）
+                self._game_over_surface = None
+
+        # 背景回填前把本帧会变化的区域都标记出来
+        if self.state == GAME_RUNNING:
+            self._mark_hud_dirty()
+            self._mark_hazards_dirty()
+        if animation_manager.get_animation_count():
+            # 粒子位置任意，活跃期间退回整屏更新
+            render_optimizer.mark_full_update()
+
+        # 铺底：稳态只在脏区域回填背景，整屏blit留给全屏更新
+        if self.state == GAME_RUNNING and not render_optimizer.full_update:
+            background = self._background
+            blit = self.screen.blit
+            for rect in render_optimizer.pending_rects():
+                blit(background, rect, rect)
+        else:
+            self.screen.blit(self._background, (0, 0))
+
+        if self.state == GAME_RUNNING:
+            # 绘制蛇和食物
+            self.snake.draw(self.screen)
+            self.food.draw(self.screen)
+            
+            # 绘制环境危险（生存模式）
+            self._draw_environmental_hazards()
+
+            # 绘制分数
+            self.draw_score()
+
+        elif self.state == GAME_PAUSED:
+            # 绘制游戏内容（暂停时仍显示游戏画面）
+            self.snake.draw(self.screen)
+            self.food.draw(self.screen)
+            self.draw_score()
+            # 绘制暂停覆盖层
+            self.draw_paused()
+        
+        elif self.state == GAME_OVER:
+            # 绘制游戏结束画面
+            self.draw_game_over()
+        
+        # 绘制动画效果（整屏更新已在背景回填前标记）
+        animation_manager.draw(self.screen)
+
+        # 使用渲染优化器更新显示
+        render_optimizer.update_display(self.screen)
+    
+    def draw_grid(self):
+        """绘制网格线（blit启动时预渲染的背景）"""
+        self.screen.blit(self._grid_bg, (0, 0))
+    
+    def _mark_hud_dirty(self):
+        """HUD内容有变化时把信息栏和提示条标记为脏区域"""
+        current_mode = self._current_mode
+        hud_state = (self.score, self.high_score, self.snake.get_length(),
+                     self.current_fps, self.game_time, current_mode.name,
+                     current_mode.get_score_multiplier(),
+                     current_mode.get_status_text(),
+                     self.next_score_multiplier,
+                     self.invincible_timer // 60,
+                     self.message_timer > 0, self.message)
+        if hud_state != self._hud_state:
+            self._hud_state = hud_state
+            # 左侧信息栏
+            render_optimizer.mark_dirty(0, 0, 250, 260)
+            # 居中提示条（出现和消失都需要重绘该区域）
+            render_optimizer.mark_dirty(0, 145, WINDOW_WIDTH, 30)
+
+    def _hud_surface(self, key: str, text: str, color: Tuple[int, int, int] = WHITE) -> pygame.Surface:
+        """获取HUD文字表面，文本未变化时复用缓存
+
+        Args:
+            key: 缓存键（每行HUD一个）
+            text: 要显示的完整文本
+            color: 文字颜色
+
+        Returns:
+            渲染好的文字表面
+        """
+        entry = self._hud_cache.get(key)
+        if entry is not None and entry[0] == text:
+            return entry[1]
+        surface = self.small_font.render(text, True, color)
+        self._hud_cache[key] = (text, surface)
+        return surface
+
+    def _append_hud_line(self, blits: list, label_key: str, value: str,
+                         color: Tuple[int, int, int], y: int):
+        """往批量blit序列里追加一行HUD：静态标签 + 缓存的数值表面
+
+        Args:
+            blits: (表面, 位置)序列
+            label_key: 标签键（对应_label_surfs）
+            value: 数值文本
+            color: 数值颜色
+            y: 行的y坐标
+        """
+        label = self._label_surfs[label_key]
+        blits.append((label, (10, y)))
+        blits.append((_render_value(self.small_font, value, color),
+                      (10 + label.get_width(), y)))
+
+    def draw_score(self):
+        """绘制分数"""
+        current_mode = self._current_mode
+
+        # 标签只渲染过一次，数值按(文本, 颜色)缓存，未变化的行零渲染开销；
+        # 所有行攒成一个序列后用Surface.blits一次提交，省去逐次的C边界调用
+        blits = []
+        self._append_hud_line(blits, 'score', str(self.score), WHITE, 10)
+        self._append_hud_line(blits, 'high_score', str(self.high_score), WHITE, 35)
+        self._append_hud_line(blits, 'length', str(self.snake.get_length()), WHITE, 60)
+        self._append_hud_line(blits, 'fps', f"{self.current_fps} FPS", WHITE, 85)
+        self._append_hud_line(blits, 'time', f"{self.game_time}s", WHITE, 110)
+        self._append_hud_line(blits, 'mode', current_mode.name, ORANGE, 135)
+        self._append_hud_line(blits, 'multiplier',
+                              f"{current_mode.get_score_multiplier():.1f}x", GOLD, 160)
+
+        # 绘制模式状态（整行动态，走逐行缓存）
+        status_text_content = current_mode.get_status_text()
+        if status_text_content:
+            blits.append((self._hud_surface('status', status_text_content, GREEN),
+                          (10, 185)))
+        
+        # 绘制功能性果实状态
+        y_offset = 210
+        if self.next_score_multiplier > 1.0:
+            self._append_hud_line(blits, 'next_bonus', f"{self.next_score_multiplier:.1f}x",
+                                  (255, 100, 255), y_offset)
+            y_offset += 25
+
+        if self.invincible_timer > 0:
+            self._append_hud_line(blits, 'invincible', f"{self.invincible_timer // 60 + 1}s",
+                                  (255, 255, 0), y_offset)
+
+        self.screen.blits(blits, doreturn=False)
+        
+        # 绘制提示信息
+        if self.message_timer > 0:
+            self.draw_message()
+    
+    def _get_overlay_texts(self):
+        """获取覆盖层的静态文本表面，首次调用时渲染一次"""
+        if self._overlay_texts is None:
+            self._overlay_texts = {
+                'game_over': self.font.render("游戏结束!", True, RED),
+                'restart': self.small_font.render("按空格键重新开始", True, WHITE),
+                'settings': self.small_font.render("按R键返回设置", True, ORANGE),
+                'quit': self.small_font.render("按ESC键退出", True, WHITE),
+                'paused': self.font.render("游戏暂停", True, WHITE),
+                'resume': self.small_font.render("按P键继续", True, WHITE),
+            }
+        return self._overlay_texts
+
+    def _build_game_over_surface(self) -> pygame.Surface:
+        """合成完整的游戏结束画面（遮罩 + 全部文字）
+
+        每局结束只构建一次；名言也只抽取一次，画面不会逐帧闪变。
+
+        Returns:
+            可整张blit的结束画面表面
+        """
+        surface = self._plain_bg.copy()
+        surface.blit(self._dim_overlay, (0, 0))
+        static_texts = self._get_overlay_texts()
+        
+        # 导入名言系统
+        from .quotes import get_random_quote
+        quote = get_random_quote()
+        
+        # 游戏结束文本
+        game_over_text = static_texts['game_over']
+        score_text = self.font.render(f"最终分数: {self.score}", True, WHITE)
+        high_score_text = self.font.render(f"最高分: {self.high_score}", True, WHITE)
+        
+        # 名言显示（可能需要分行）
+        quote_words = quote.split()
+        quote_lines = []
+        current_line = ""
+        
+        for word in quote_words:
+            if len(current_line + " " + word) > 60:  # 控制每行字符数
+                quote_lines.append(current_line)
+                current_line = word
+            else:
+                current_line = current_line + " " + word if current_line else word
+        
+        if current_line:
+            quote_lines.append(current_line)
+        
+        # 居中显示文本
+        texts = [game_over_text, score_text, high_score_text]
+        
+        # 添加名言
+        for line in quote_lines:
+            quote_text = self.small_font.render(line, True, GOLD)
+            texts.append(quote_text)
+            
+        # 添加操作提示（静态文本取自缓存）
+        texts.extend([static_texts['restart'], static_texts['settings'],
+                      static_texts['quit']])
+        
+        y_offset = WINDOW_HEIGHT // 2 - len(texts) * 30 // 2
+        
+        for i, text in enumerate(texts):
+            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, y_offset + i * 35))
+            surface.blit(text, text_rect)
+
+        return surface
+
+    def draw_game_over(self):
+        """绘制游戏结束画面（整张取自本局的合成缓存）"""
+        if self._game_over_surface is None:
+            self._game_over_surface = self._build_game_over_surface()
+        self.screen.blit(self._game_over_surface, (0, 0))
+    
+    def restart_game(self):
+        """重新开始游戏"""
+        self.snake.reset()
+        self.food.respawn(self.snake.body)
+        self.score = 0
+        self.state = GAME_RUNNING
+        # 重置游戏速度到初始值
+        self.current_fps = self.config.get('game_settings', 'initial_fps')
+        self._next_speed_threshold = self.speed_increase_interval
+        # 重置游戏时间
+        self._tick_counter = 0
+        self._next_second_tick = self.current_fps
+        self.game_time = 0
+        # 清除提示信息
+        self.message = ""
+        self.message_timer = 0
+        
+        # 重新启动游戏模式并刷新缓存的模式引用
+        game_mode_manager.start_current_mode(self)
+        self._current_mode = game_mode_manager.get_current_mode()
+    
+    
+    def draw_paused(self):
+        """绘制暂停画面"""
+        # 半透明背景（预创建的遮罩）
+        self.screen.blit(self._dim_overlay, (0, 0))
+        
+        # 暂停文本（静态文本取自缓存）
+        static_texts = self._get_overlay_texts()
+        paused_text = static_texts['paused']
+        resume_text = static_texts['resume']
+        
+        # 居中显示文本
+        texts = [paused_text, resume_text]
+        y_offset = WINDOW_HEIGHT // 2 - len(texts) * 30 // 2
+        
+        for i, text in enumerate(texts):
+            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, y_offset + i * 40))
+            self.screen.blit(text, text_rect)
+    
+    def _game_over_quit(self):
+        """游戏结束画面：退出游戏"""
+        self._running = False
+
+    def _game_over_return(self):
+        """游戏结束画面：返回设置界面"""
+        self._return_to_settings = True
+        self._running = False
+
+    def _game_over_restart(self):
+        """游戏结束画面：重新开始"""
+        self.restart_game()
+
+    def run(self):
+        """运行游戏主循环"""
+        self._running = True
+        accumulator = 0.0  # 累积的未消耗时间（毫秒）
+
+        while self._running:
+            # 渲染保持60Hz，游戏逻辑按current_fps的固定步长推进
+            accumulator += self.clock.tick(60)
+            if accumulator > 250.0:
+                accumulator = 250.0  # 卡顿后丢弃积压，避免追帧螺旋
+
+            # 处理事件
+            self._running = self.handle_events()
+
+            # 以固定步长消耗累积时间（速度变化时步长随之更新）
+            logic_dt = 1000.0 / self.current_fps
+            ticks_ran = 0
+            while accumulator >= logic_dt:
+                self.update()
+                ticks_ran += 1
+                accumulator -= logic_dt
+
+            # 只有画面会变化时才绘制：运行中推进过逻辑tick、状态刚切换、
+            # 动画活跃或有消息等显式标记，否则（如静止的暂停画面）整帧跳过
+            if (self._dirty or self.state != self._last_drawn_state or
+                    (ticks_ran and self.state == GAME_RUNNING) or
+                    animation_manager.get_animation_count()):
+                self._dirty = False
+                self.draw()
+
+        return self._return_to_settings
+    
+    def show_message(self, text: str, color: Tuple[int, int, int] = WHITE):
+        """显示提示信息
+        
+        Args:
+            text: 提示文本
+            color: 文本颜色
+        """
+        self.message = text
+        self.message_color = color
+        self.message_timer = self.message_duration
+        self._dirty = True  # 消息可能在任意状态下弹出，强制重绘一帧
+        # 文字表面在这里渲染一次（复用数值缓存，"+10分"这类字符串常重复），
+        # 之后的120帧draw_message只做blit
+        self._message_surface = _render_value(self.small_font, text, color)
+        self._message_x = (WINDOW_WIDTH - self._message_surface.get_width()) // 2
+    
+    def draw_message(self):
+        """绘制提示信息（表面已在show_message时渲染好）"""
+        if self.message:
+            # 居中显示在屏幕上方
+            self.screen.blit(self._message_surface, (self._message_x, 150))
+    
+    def save_game(self, slot_name: str = None) -> bool:
+        """保存游戏状态
+        
+        Args:
+            slot_name: 存档槽名称
+            
+        Returns:
+            是否保存成功
+        """
+        try:
+            game_state = {
+                'score': self.score,
+                'snake_body': self.snake.body,
+                'snake_direction': self.snake.direction,
+                'food_position': self.food.position,
+                'food_is_special': self.food.is_special,
+                'food_special_timer': self.food.special_timer,
+                'current_fps': self.current_fps,
+                'game_time': self.game_time,
+                'snake_length': self.snake.get_length(),
+                'difficulty': self._current_mode.name,
+                'mode_data': self._current_mode.mode_data
+            }
+            
+            success = save_manager.save_game(game_state, slot_name)
+            if success:
+                self.show_message("游戏已保存!", GREEN)
+            else:
+                self.show_message("保存失败!", RED)
+            return success
+            
+        except Exception as e:
+            print(f"保存游戏失败: {e}")
+            self.show_message("保存失败!", RED)
+            return False
+    
+    def load_game(self, slot_name: str) -> bool:
+        """加载游戏状态
+        
+        Args:
+            slot_name: 存档槽名称
+            
+        Returns:
+            是否加载成功
+        """
+        try:
+            game_state = save_manager.load_game(slot_name)
+            if not game_state:
+                self.show_message("加载失败!", RED)
+                return False
+            
+            # 恢复游戏状态
+            self.score = game_state.get('score', 0)
+            self.snake.body = game_state.get('snake_body', [(10, 10)])
+            self.snake.rebuild_body_set()
+            self.snake.direction = tuple(game_state.get('snake_direction', RIGHT))
+            self.snake.next_direction = self.snake.direction
+            
+            self.food.position = tuple(game_state.get('food_position', (15, 15)))
+            self.food.is_special = game_state.get('food_is_special', False)
+            self.food.special_timer = game_state.get('food_special_timer', 0)
+            
+            self.current_fps = game_state.get('current_fps', 10)
+            self.game_time = game_state.get('game_time', 0)
+            # 根据恢复的分数对齐下一个提速阈值
+            self._next_speed_threshold = (
+                self.score // self.speed_increase_interval + 1) * self.speed_increase_interval
+            
+            # 恢复游戏模式数据（顺带刷新缓存的模式引用）
+            self._current_mode = game_mode_manager.get_current_mode()
+            self._current_mode.mode_data = game_state.get('mode_data', {})
+            
+            self.state = GAME_RUNNING
+            self._tick_counter = self.game_time * self.current_fps
+            self._next_second_tick = self._tick_counter + self.current_fps
+            
+            self.show_message("游戏已加载!", GREEN)
+            render_optimizer.mark_full_update()
+            return True
+            
+        except Exception as e:
+            print(f"加载游戏失败: {e}")
+            self.show_message("加载失败!", RED)
+            return False
+    
+    def _update_achievements(self):
+        """更新成就统计"""
+        try:
+            # 更新统计数据
+            achievement_system.update_stats(
+                total_games=1,
+                total_score=self.score,
+                highest_score=self.score,
+                max_snake_length=self.snake.get_length(),
+                max_game_time=self.game_time
+            )
+            
+            # 保存成就进度
+            achievement_system.save_achievements()
+            
+        except Exception as e:
+            print(f"更新成就失败: {e}")
+    
+    def _setup_input_callbacks(self):
+        """设置输入回调"""
+        # 设置方向改变回调
+        input_manager.set_direction_callback(self._on_direction_change)
+        
+        # 设置暂停键
+        input_manager.set_key_callback(pygame.K_p, self._toggle_pause)
+        
+        # 设置游戏结束时的按键
+        input_manager.set_key_callback(pygame.K_SPACE, self._on_space_key)
+        input_manager.set_key_callback(pygame.K_r, self._on_return_key)
+        input_manager.set_key_callback(pygame.K_s, self._on_save_key)
+        
+        # 设置方向改变延迟
+        input_manager.set_direction_change_delay(0.05)
+    
+    def _on_direction_change(self, direction):
+        """方向改变回调"""
+        if self.state == GAME_RUNNING:
+            self.snake.change_direction(direction)
+    
+    def _toggle_pause(self):
+        """切换暂停状态"""
+        if self.state == GAME_RUNNING:
+            self.state = GAME_PAUSED
+            self.show_message("游戏暂停", WHITE)
+        elif self.state == GAME_PAUSED:
+            self.state = GAME_RUNNING
+            self.show_message("游戏继续", WHITE)
+    
+    def _on_space_key(self):
+        """空格键回调"""
+        pass # 清空原有逻辑
+    
+    def _on_return_key(self):
+        """返回键回调"""
+        pass # 清空原有逻辑
+    
+    def _on_save_key(self):
+        """保存键回调"""
+        if self.state == GAME_OVER:
+            self.save_game()
+    
+    def _update_fruit_effects(self):
+        """更新功能性果实效果"""
+        # 更新无敌时间
+        if self.invincible_timer > 0:
+            self.invincible_timer -= 1
+            if self.invincible_timer <= 0:
+                self.show_message("无敌状态结束", WHITE)
+    
+    def _apply_fruit_effect(self, food_effect):
+        """应用功能性果实效果（按类型查表分发）"""
+        handler = self._effect_handlers.get(food_effect['type'])
+        if handler is not None:
+            handler(food_effect['data'])
+
+    def _eff_double_score(self, effect_data):
+        """双倍分数果实"""
+        self.next_score_multiplier = effect_data.get('next_score_multiplier', 2.0)
+        self.show_message("下一个果实双倍分数!", (255, 100, 255))
+
+    def _eff_speed_up(self, effect_data):
+        """速度提升果实"""
+        speed_change = effect_data.get('speed_change', 5)
+        self.current_fps = min(50, self.current_fps + speed_change)
+        self.show_message(f"速度提升! {self.current_fps} FPS", ORANGE)
+
+    def _eff_speed_down(self, effect_data):
+        """速度减慢果实"""
+        speed_change = effect_data.get('speed_change', -3)
+        self.current_fps = max(5, self.current_fps + speed_change)
+        self.show_message(f"速度减慢! {self.current_fps} FPS", BLUE)
+
+    def _eff_length_double(self, effect_data):
+        """长度翻倍果实：O(1)累加待增长计数"""
+        self.snake.grow(len(self.snake.body))
+        self.show_message("蛇身长度翻倍!", (0, 255, 255))
+
+    def _eff_shrink(self, effect_data):
+        """蛇身缩短果实"""
+        body = self.snake.body
+        length = len(body)
+        if length > 3:
+            # 一次del截断代替逐段pop，长度只算一次
+            shrink_count = max(1, length // 3)
+            new_length = max(3, length - shrink_count)
+            del body[new_length:]
+            self.snake.rebuild_body_set()
+            self.show_message(f"蛇身缩短 -{length - new_length}节!", PURPLE)
+
+    def _eff_invincible(self, effect_data):
+        """短暂无敌果实"""
+        self.invincible_timer = effect_data.get('duration', 180)
+        self.show_message("获得无敌状态!", (255, 255, 0))
+    
+    def _get_hazard_positions(self):
+        """获取危险区域格子集合（用于生存模式的食物刷新）
+
+        结果按危险配置（位置+半径）缓存为frozenset：危险不变时
+        每次吃到食物直接复用，不再重跑双重循环；frozenset也让
+        respawn的成员判断保持O(1)。
+        """
+        current_mode = self._current_mode
+
+        if not (hasattr(current_mode, 'mode_data') and 'environmental_hazards' in current_mode.mode_data):
+            return frozenset()
+
+        hazards = current_mode.mode_data['environmental_hazards']
+        cache_key = tuple((tuple(h.get('position')), h.get('radius', 1)) for h in hazards)
+        if cache_key == self._hazard_cells_cache[0]:
+            return self._hazard_cells_cache[1]
+
+        cells = set()
+        for hazard in hazards:
+            hazard_pos = hazard.get('position')
+            hazard_radius = hazard.get('radius', 1)
+
+            # 添加危险区域及其周围的位置
+            for dx in range(-hazard_radius, hazard_radius + 1):
+                for dy in range(-hazard_radius, hazard_radius + 1):
+                    pos = (hazard_pos[0] + dx, hazard_pos[1] + dy)
+                    if (0 <= pos[0] < GRID_WIDTH and 0 <= pos[1] < GRID_HEIGHT):
+                        cells.add(pos)
+
+        result = frozenset(cells)
+        self._hazard_cells_cache = (cache_key, result)
+        return result
+    
+    def _mark_hazards_dirty(self):
+        """把危险区域的覆盖范围标记为脏区域
+
+        透明度随时间变化，必须每帧重绘；在背景回填前标记，
+        保证半透明填充画在干净的底色上而不是上一帧的残留上。
+        """
+        current_mode = self._current_mode
+        if hasattr(current_mode, 'mode_data') and 'environmental_hazards' in current_mode.mode_data:
+            for hazard in current_mode.mode_data['environmental_hazards']:
+                hazard_pos = hazard.get('position')
+                hazard_radius = hazard.get('radius', 1)
+                render_optimizer.mark_dirty_grid(
+                    hazard_pos[0] - hazard_radius, hazard_pos[1] - hazard_radius,
+                    2 * hazard_radius + 1, 2 * hazard_radius + 1)
+
+    @classmethod
+    def _get_hazard_offsets(cls, radius: int) -> Tuple[Tuple[int, int], ...]:
+        """获取指定半径的曼哈顿圆盘格子偏移，首次调用时计算并缓存
+
+        Args:
+            radius: 危险区域半径
+
+        Returns:
+            满足 |dx|+|dy| <= radius 的(dx, dy)偏移元组
+        """
+        offsets = cls._HAZARD_OFFSETS.get(radius)
+        if offsets is None:
+            offsets = tuple(
+                (dx, dy)
+                for dx in range(-radius, radius + 1)
+                for dy in range(-radius, radius + 1)
+                if abs(dx) + abs(dy) <= radius
+            )
+            cls._HAZARD_OFFSETS[radius] = offsets
+        return offsets
+
+    def _get_hazard_surface(self, hazard_type: str, alpha: int) -> pygame.Surface:
+        """获取危险区域的半透明填充面，按(类型, 透明度档位)缓存
+
+        透明度量化成8档，避免alpha逐帧微变导致缓存失效。
+
+        Args:
+            hazard_type: 危险类型
+            alpha: 0~255的原始透明度
+
+        Returns:
+            设好alpha的单格填充面
+        """
+        key = (hazard_type, alpha >> 5)
+        surface = self._hazard_surf_cache.get(key)
+        if surface is None:
+            surface = pygame.Surface((GRID_SIZE, GRID_SIZE))
+            surface.fill(PURPLE if hazard_type == 'poison_zone' else BLUE)
+            # 用档位中点的透明度，再按原逻辑减半
+            surface.set_alpha(((alpha >> 5) * 32 + 16) // 2)
+            self._hazard_surf_cache[key] = surface
+        return surface
+
+    def _draw_environmental_hazards(self):
+        """绘制环境危险区域"""
+        current_mode = self._current_mode
+        
+        if hasattr(current_mode, 'mode_data') and 'environmental_hazards' in current_mode.mode_data:
+            screen = self.screen
+            half = GRID_SIZE // 2
+            for hazard in current_mode.mode_data['environmental_hazards']:
+                hazard_pos = hazard.get('position')
+                hazard_type = hazard.get('type')
+                hazard_radius = hazard.get('radius', 1)
+                duration = hazard.get('duration', 0)
+                
+                # 计算透明度（剩余时间越少越透明）
+                max_duration = 20 * self.current_fps if hazard_type == 'speed_trap' else 15 * self.current_fps
+                alpha = min(255, int(255 * (duration / max_duration)))
+                hazard_surface = self._get_hazard_surface(hazard_type, alpha)
+
+                # 毒气闪烁和漩涡角度整个危险区共用，循环外查表取偏移
+                poison_flicker = hazard_type == 'poison_zone' and duration % 20 < 10
+                if hazard_type == 'speed_trap':
+                    bucket = ((duration * 5) % 360) // 6
+                    swirl_offsets = (
+                        _SWIRL_OFFSETS[bucket],
+                        _SWIRL_OFFSETS[(bucket + 20) % 60],
+                        _SWIRL_OFFSETS[(bucket + 40) % 60],
+                    )
+
+                # 绘制危险区域（偏移表按半径预计算）
+                for dx, dy in self._get_hazard_offsets(hazard_radius):
+                    cell_x = hazard_pos[0] + dx
+                    cell_y = hazard_pos[1] + dy
+
+                    # 检查是否在屏幕范围内
+                    if not (0 <= cell_x < GRID_WIDTH and 0 <= cell_y < GRID_HEIGHT):
+                        continue
+
+                    x = cell_x * GRID_SIZE
+                    y = cell_y * GRID_SIZE
+                    screen.blit(hazard_surface, (x, y))
+
+                    if poison_flicker:
+                        # 毒气粒子效果
+                        pygame.draw.circle(screen, (200, 0, 200),
+                                           (x + half, y + half), 3)
+                    elif hazard_type == 'speed_trap':
+                        # 漩涡效果
+                        center_x = x + half
+                        center_y = y + half
+                        for offset_x, offset_y in swirl_offsets:
+                            pygame.draw.circle(screen, WHITE,
+                                               (center_x + offset_x, center_y + offset_y), 2)
@@ -1,265 +1,318 @@
-"""
-游戏菜单系统
-"""
-
-import pygame
-import sys
-from .constants import *
-
-
-class Menu:
-    """游戏菜单类"""
-    
-    def __init__(self, screen, font, small_font):
-        self.screen = screen
-        self.font = font
-        self.small_font = small_font
-        self.selected_option = 0
-        self.menu_options = [
-            "开始游戏",
-            "设置",
-            "查看最高分",
-            "帮助",
-            "退出游戏"
-        ]
-    
-    def handle_events(self):
-        """处理菜单事件"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return "quit"
-            
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    print(f"DEBUG: len() called on type: {type(self.menu_options)} in game/menu.py")
-                    self.selected_option = (self.selected_option - 1) % len(self.menu_options)
-                elif event.key == pygame.K_DOWN:
-                    print(f"DEBUG: len() called on type: {type(self.menu_options)} in game/menu.py")
-                    self.selected_option = (self.selected_option + 1) % len(self.menu_options)
-                elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-                    return self.get_selected_action()
-                elif event.key == pygame.K_ESCAPE:
-                    return "quit"
-        
-        return None
-    
-    def get_selected_action(self):
-        """获取选中的动作"""
-        actions = ["start_game", "settings", "high_score", "help", "quit"]
-        return actions[self.selected_option]
-    
-    def draw(self):
-        """绘制菜单"""
-        self.screen.fill(BLACK)
-        
-        # 绘制标题
-        title_text = self.font.render("🐍 贪吃蛇游戏 🐍", True, GREEN)
-        title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 150))
-        self.screen.blit(title_text, title_rect)
-        
-        # 绘制菜单选项
-        start_y = 250
-        for i, option in enumerate(self.menu_options):
-            color = WHITE if i == self.selected_option else GRAY
-            if i == self.selected_option:
-                # 高亮选中项
-                option_text = f"► {option} ◄"
-            else:
-                option_text = f"  {option}  "
-            
-            text_surface = self.small_font.render(option_text, True, color)
-            text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, start_y + i * 50))
-            self.screen.blit(text_surface, text_rect)
-        
-        # 绘制操作提示
-        help_text = self.small_font.render("使用 ↑↓ 选择，回车确认，ESC退出", True, GRAY)
-        help_rect = help_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 50))
-        self.screen.blit(help_text, help_rect)
-        
-        pygame.display.flip()
-
-
-class SettingsMenu:
-    """设置菜单类"""
-    
-    def __init__(self, screen, font, small_font, config):
-        self.screen = screen
-        self.font = font
-        self.small_font = small_font
-        self.config = config
-        self.selected_option = 0
-        self.settings_options = [
-            "难度设置",
-            "音效开关",
-            "音量调节",
-            "显示网格",
-            "返回主菜单"
-        ]
-    
-    def handle_events(self):
-        """处理设置菜单事件"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return "quit"
-            
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    print(f"DEBUG: len() called on type: {type(self.settings_options)} in game/menu.py")
-                    self.selected_option = (self.selected_option - 1) % len(self.settings_options)
-                elif event.key == pygame.K_DOWN:
-                    print(f"DEBUG: len() called on type: {type(self.settings_options)} in game/menu.py")
-                    self.selected_option = (self.selected_option + 1) % len(self.settings_options)
-                elif event.key == pygame.K_LEFT or event.key == pygame.K_RIGHT:
-                    self.adjust_setting(event.key == pygame.K_RIGHT)
-                elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-                    print(f"DEBUG: len() called on type: {type(self.settings_options)} in game/menu.py")
-                    if self.selected_option == len(self.settings_options) - 1:
-                        return "back"
-                    else:
-                        self.adjust_setting(True)
-                elif event.key == pygame.K_ESCAPE:
-                    return "back"
-        
-        return None
-    
-    def adjust_setting(self, increase):
-        """调整设置"""
-        if self.selected_option == 0:  # 难度设置
-            difficulties = ["easy", "normal", "hard"]
-            current = self.config['game_settings']['difficulty']
-            current_index = difficulties.index(current) if current in difficulties else 1
-            if increase:
-                print(f"DEBUG: len() called on type: {type(difficulties)} in game/menu.py")
-                new_index = (current_index + 1) % len(difficulties)
-            else:
-                print(f"DEBUG: len() called on type: {type(difficulties)} in game/menu.py")
-                new_index = (current_index - 1) % len(difficulties)
-            self.config['game_settings']['difficulty'] = difficulties[new_index]
-        
-        elif self.selected_option == 1:  # 音效开关
-            self.config['sound_settings']['enabled'] = not self.config['sound_settings']['enabled']
-        
-        elif self.selected_option == 2:  # 音量调节
-            current_volume = self.config['sound_settings']['volume']
-            if increase:
-                new_volume = min(1.0, current_volume + 0.1)
-            else:
-                new_volume = max(0.0, current_volume - 0.1)
-            self.config['sound_settings']['volume'] = round(new_volume, 1)
-        
-        elif self.selected_option == 3:  # 显示网格
-            self.config['game_settings']['show_grid'] = not self.config['game_settings']['show_grid']
-    
-    def draw(self):
-        """绘制设置菜单"""
-        self.screen.fill(BLACK)
-        
-        # 绘制标题
-        title_text = self.font.render("游戏设置", True, GREEN)
-        title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 100))
-        self.screen.blit(title_text, title_rect)
-        
-        # 绘制设置选项
-        start_y = 200
-        for i, option in enumerate(self.settings_options):
-            color = WHITE if i == self.selected_option else GRAY
-            
-            # 获取当前设置值
-            if i == 0:  # 难度
-                value = self.config['game_settings']['difficulty']
-                option_text = f"{option}: {value}"
-            elif i == 1:  # 音效
-                value = "开启" if self.config['sound_settings']['enabled'] else "关闭"
-                option_text = f"{option}: {value}"
-            elif i == 2:  # 音量
-                value = int(self.config['sound_settings']['volume'] * 100)
-                option_text = f"{option}: {value}%"
-            elif i == 3:  # 网格
-                value = "显示" if self.config['game_settings']['show_grid'] else "隐藏"
-                option_text = f"{option}: {value}"
-            else:
-                option_text = option
-            
-            if i == self.selected_option and i < len(self.settings_options) - 1:
-                option_text = f"► {option_text} ◄"
-            elif i == self.selected_option:
-                option_text = f"► {option_text} ◄"
-            else:
-                option_text = f"  {option_text}  "
-            
-            text_surface = self.small_font.render(option_text, True, color)
-            text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, start_y + i * 50))
-            self.screen.blit(text_surface, text_rect)
-        
-        # 绘制操作提示
-        help_text = self.small_font.render("使用 ↑↓ 选择，←→ 调整，回车确认，ESC返回", True, GRAY)
-        help_rect = help_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 50))
-        self.screen.blit(help_text, help_rect)
-        
-        pygame.display.flip()
-
-
-class HelpMenu:
-    """帮助菜单类"""
-    
-    def __init__(self, screen, font, small_font):
-        self.screen = screen
-        self.font = font
-        self.small_font = small_font
-    
-    def handle_events(self):
-        """处理帮助菜单事件"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return "quit"
-            elif event.type == pygame.KEYDOWN:
-                return "back"
-        return None
-    
-    def draw(self):
-        """绘制帮助菜单"""
-        self.screen.fill(BLACK)
-        
-        # 绘制标题
-        title_text = self.font.render("游戏帮助", True, GREEN)
-        title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 80))
-        self.screen.blit(title_text, title_rect)
-        
-        # 帮助内容
-        help_content = [
-            "游戏控制:",
-            "  ↑ ↓ ← → : 控制蛇的移动方向",
-            "  P : 暂停/继续游戏",
-            "  ESC : 退出游戏",
-            "  SPACE : 重新开始游戏（游戏结束时）",
-            "",
-            "游戏规则:",
-            "  • 控制蛇吃红色食物",
-            "  • 普通食物得10分，特殊食物得20分",
-            "  • 每吃一个食物，蛇身变长",
-            "  • 撞墙或撞到自己游戏结束",
-            "  • 随着分数增加，游戏速度会提升",
-            "",
-            "特殊食物:",
-            "  • 金色闪烁的食物价值更高",
-            "  • 有时间限制，会自动消失",
-            "",
-            "按任意键返回主菜单"
-        ]
-        
-        start_y = 140
-        for i, line in enumerate(help_content):
-            if line.startswith("游戏控制:") or line.startswith("游戏规则:") or line.startswith("特殊食物:"):
-                color = GREEN
-                font = self.small_font
-            elif line.startswith("  "):
-                color = WHITE
-                font = self.small_font
-            else:
-                color = GRAY
-                font = self.small_font
-            
-            text_surface = font.render(line, True, color)
-            self.screen.blit(text_surface, (50, start_y + i * 35))
-        
+"""
+游戏菜单系统
+"""
+
+import pygame
+import sys
+from .constants import *
+
+
+# 菜单只关心退出和按键按下，事件队列按类型过滤后一次取空
+_MENU_EVENT_TYPES = (pygame.QUIT, pygame.KEYDOWN)
+
+# 上下导航键到选项步进的映射，以及确认键集合：
+# 每个事件只做一次哈希查找，代替逐个等值比较
+_NAV_STEPS = {pygame.K_UP: -1, pygame.K_DOWN: 1}
+_CONFIRM_KEYS = frozenset((pygame.K_RETURN, pygame.K_SPACE))
+
+
+class Menu:
+    """游戏菜单类"""
+    
+    def __init__(self, screen, font, small_font):
+        self.screen = screen
+        self.font = font
+        self.small_font = small_font
+        self.selected_option = 0
+        self.menu_options = [
+            "开始游戏",
+            "设置",
+            "查看最高分",
+            "帮助",
+            "退出游戏"
+        ]
+
+        # 菜单文本全部静态，构造时渲染一次，draw只剩blit
+        self._title_surf = font.render("🐍 贪吃蛇游戏 🐍", True, GREEN)
+        self._title_rect = self._title_surf.get_rect(center=(WINDOW_WIDTH // 2, 150))
+        self._help_surf = small_font.render("使用 ↑↓ 选择，回车确认，ESC退出", True, GRAY)
+        self._help_rect = self._help_surf.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 50))
+
+        # 每个选项预渲染选中/未选中两种表面及对应位置
+        start_y = 250
+        self._option_surfs = []
+        for i, option in enumerate(self.menu_options):
+            selected = small_font.render(f"► {option} ◄", True, WHITE)
+            normal = small_font.render(f"  {option}  ", True, GRAY)
+            center = (WINDOW_WIDTH // 2, start_y + i * 50)
+            self._option_surfs.append((
+                (selected, selected.get_rect(center=center)),
+                (normal, normal.get_rect(center=center)),
+            ))
+
+        # 整帧的blit序列：标题 + 各选项 + 操作提示，
+        # 选中项变化时只换掉对应的两个条目，整组经blits一次提交
+        self._blit_seq = [(self._title_surf, self._title_rect)]
+        for i, (selected, normal) in enumerate(self._option_surfs):
+            self._blit_seq.append(selected if i == self.selected_option else normal)
+        self._blit_seq.append((self._help_surf, self._help_rect))
+        self._seq_selected = self.selected_option
+
+        # 画面是否需要重绘：选中项没变时跳过整帧blit和flip
+        self._dirty = True
+    
+    def handle_events(self):
+        """处理菜单事件"""
+        for event in pygame.event.get(_MENU_EVENT_TYPES):
+            if event.type == pygame.QUIT:
+                return "quit"
+            
+            # 过滤后只剩KEYDOWN
+            key = event.key
+            step = _NAV_STEPS.get(key)
+            if step is not None:
+                self.selected_option = (self.selected_option + step) % len(self.menu_options)
+                self._dirty = True
+            elif key in _CONFIRM_KEYS:
+                return self.get_selected_action()
+            elif key == pygame.K_ESCAPE:
+                return "quit"
+        
+        return None
+    
+    def get_selected_action(self):
+        """获取选中的动作"""
+        actions = ["start_game", "settings", "high_score", "help", "quit"]
+        return actions[self.selected_option]
+    
+    def draw(self):
+        """绘制菜单"""
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        # 选中项变化时只替换序列里的旧/新两个条目
+        selected_option = self.selected_option
+        if selected_option != self._seq_selected:
+            seq = self._blit_seq
+            seq[1 + self._seq_selected] = self._option_surfs[self._seq_selected][1]
+            seq[1 + selected_option] = self._option_surfs[selected_option][0]
+            self._seq_selected = selected_option
+
+        screen = self.screen
+        screen.fill(BLACK)
+        screen.blits(self._blit_seq, doreturn=False)
+        
+        pygame.display.flip()
+
+
+class SettingsMenu:
+    """设置菜单类"""
+    
+    def __init__(self, screen, font, small_font, config):
+        self.screen = screen
+        self.font = font
+        self.small_font = small_font
+        self.config = config
+        self.selected_option = 0
+        self.settings_options = [
+            "难度设置",
+            "音效开关",
+            "音量调节",
+            "显示网格",
+            "返回主菜单"
+        ]
+
+        # 静态文本渲染一次；带设置值的选项行按(文本, 颜色)缓存，
+        # 设置值的取值范围有限，缓存很快收敛到全命中
+        self._title_surf = font.render("游戏设置", True, GREEN)
+        self._title_rect = self._title_surf.get_rect(center=(WINDOW_WIDTH // 2, 100))
+        self._help_surf = small_font.render(
+            "使用 ↑↓ 选择，←→ 调整，回车确认，ESC返回", True, GRAY)
+        self._help_rect = self._help_surf.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 50))
+        self._text_cache = {}
+        self._dirty = True
+    
+    def handle_events(self):
+        """处理设置菜单事件"""
+        for event in pygame.event.get(_MENU_EVENT_TYPES):
+            if event.type == pygame.QUIT:
+                return "quit"
+            
+            # 过滤后只剩KEYDOWN
+            key = event.key
+            step = _NAV_STEPS.get(key)
+            if step is not None:
+                self.selected_option = (self.selected_option + step) % len(self.settings_options)
+                self._dirty = True
+            elif key == pygame.K_LEFT or key == pygame.K_RIGHT:
+                self.adjust_setting(key == pygame.K_RIGHT)
+                self._dirty = True
+            elif key in _CONFIRM_KEYS:
+                if self.selected_option == len(self.settings_options) - 1:
+                    return "back"
+                else:
+                    self.adjust_setting(True)
+                    self._dirty = True
+            elif key == pygame.K_ESCAPE:
+                return "back"
+        
+        return None
+    
+    def adjust_setting(self, increase):
+        """调整设置"""
+        if self.selected_option == 0:  # 难度设置
+            difficulties = ["easy", "normal", "hard"]
+            current = self.config['game_settings']['difficulty']
+            current_index = difficulties.index(current) if current in difficulties else 1
+            if increase:
+                print(f"DEBUG: len() called on type: {type(difficulties)} in game/menu.py")
+                new_index = (current_index + 1) % len(difficulties)
+            else:
+                print(f"DEBUG: len() called on type: {type(difficulties)} in game/menu.py")
+                new_index = (current_index - 1) % len(difficulties)
+            self.config['game_settings']['difficulty'] = difficulties[new_index]
+        
+        elif self.selected_option == 1:  # 音效开关
+            self.config['sound_settings']['enabled'] = not self.config['sound_settings']['enabled']
+        
+        elif self.selected_option == 2:  # 音量调节
+            current_volume = self.config['sound_settings']['volume']
+            if increase:
+                new_volume = min(1.0, current_volume + 0.1)
+            else:
+                new_volume = max(0.0, current_volume - 0.1)
+            self.config['sound_settings']['volume'] = round(new_volume, 1)
+        
+        elif self.selected_option == 3:  # 显示网格
+            self.config['game_settings']['show_grid'] = not self.config['game_settings']['show_grid']
+    
+    def _get_text_surface(self, text, color):
+        """取缓存的文本表面，缺失时渲染一次并缓存"""
+        key = (text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            surface = self.small_font.render(text, True, color)
+            self._text_cache[key] = surface
+        return surface
+
+    def draw(self):
+        """绘制设置菜单"""
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        screen = self.screen
+        screen.fill(BLACK)
+        
+        blits = [(self._title_surf, self._title_rect)]
+        
+        # 绘制设置选项
+        start_y = 200
+        for i, option in enumerate(self.settings_options):
+            color = WHITE if i == self.selected_option else GRAY
+            
+            # 获取当前设置值
+            if i == 0:  # 难度
+                value = self.config['game_settings']['difficulty']
+                option_text = f"{option}: {value}"
+            elif i == 1:  # 音效
+                value = "开启" if self.config['sound_settings']['enabled'] else "关闭"
+                option_text = f"{option}: {value}"
+            elif i == 2:  # 音量
+                value = int(self.config['sound_settings']['volume'] * 100)
+                option_text = f"{option}: {value}%"
+            elif i == 3:  # 网格
+                value = "显示" if self.config['game_settings']['show_grid'] else "隐藏"
+                option_text = f"{option}: {value}"
+            else:
+                option_text = option
+            
+            if i == self.selected_option:
+                option_text = f"► {option_text} ◄"
+            else:
+                option_text = f"  {option_text}  "
+            
+            text_surface = self._get_text_surface(option_text, color)
+            text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, start_y + i * 50))
+            blits.append((text_surface, text_rect))
+        
+        blits.append((self._help_surf, self._help_rect))
+        screen.blits(blits, doreturn=False)
+        
+        pygame.display.flip()
+
+
+class HelpMenu:
+    """帮助菜单类"""
+
+    # 帮助内容固定不变
+    HELP_CONTENT = [
+        "游戏控制:",
+        "  ↑ ↓ ← → : 控制蛇的移动方向",
+        "  P : 暂停/继续游戏",
+        "  ESC : 退出游戏",
+        "  SPACE : 重新开始游戏（游戏结束时）",
+        "",
+        "游戏规则:",
+        "  • 控制蛇吃红色食物",
+        "  • 普通食物得10分，特殊食物得20分",
+        "  • 每吃一个食物，蛇身变长",
+        "  • 撞墙或撞到自己游戏结束",
+        "  • 随着分数增加，游戏速度会提升",
+        "",
+        "特殊食物:",
+        "  • 金色闪烁的食物价值更高",
+        "  • 有时间限制，会自动消失",
+        "",
+        "按任意键返回主菜单"
+    ]
+    
+    def __init__(self, screen, font, small_font):
+        self.screen = screen
+        self.font = font
+        self.small_font = small_font
+
+        # 整页内容静态，构造时把标题和所有行渲染好
+        self._title_surf = font.render("游戏帮助", True, GREEN)
+        self._title_rect = self._title_surf.get_rect(center=(WINDOW_WIDTH // 2, 80))
+
+        start_y = 140
+        self._line_blits = []
+        for i, line in enumerate(self.HELP_CONTENT):
+            if not line:
+                continue
+            if line.endswith(":"):
+                color = GREEN
+            elif line.startswith("  "):
+                color = WHITE
+            else:
+                color = GRAY
+            surface = small_font.render(line, True, color)
+            self._line_blits.append((surface, (50, start_y + i * 35)))
+        # 标题并入同一个blit序列，整页一次提交
+        self._line_blits.insert(0, (self._title_surf, self._title_rect))
+
+        # 整页静态，首次绘制后无需重画
+        self._dirty = True
+    
+    def handle_events(self):
+        """处理帮助菜单事件"""
+        for event in pygame.event.get(_MENU_EVENT_TYPES):
+            if event.type == pygame.QUIT:
+                return "quit"
+            return "back"  # 过滤后只剩KEYDOWN，任意键返回
+        return None
+    
+    def draw(self):
+        """绘制帮助菜单"""
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        screen = self.screen
+        screen.fill(BLACK)
+        
+        screen.blits(self._line_blits, doreturn=False)
+        
         pygame.display.flip()
\ No newline at end of file
@@ -258,8 +258,9 @@ class GameStartScreen:
     
     def show_achievements(self):
         """显示成就界面"""
-        # 导入成就系统
-        from game.achievement_system import achievement_system
+        # 导入成就系统（惰性单例，首次获取时构造）
+        from game.achievement_system import get_achievement_system
+        achievement_system = get_achievement_system()
         
         viewing_achievements = True
         scroll_offset = 0